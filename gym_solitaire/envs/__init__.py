@@ -1 +1,16 @@
 from gym_solitaire.envs.env import SolitaireEnv
+from gym_solitaire.envs.vec_env import VecSolitaireEnv
+
+# Imported on first use, they pull in `multiprocessing`, `asyncio` and `socket`
+LAZY = {
+    'RolloutRunner': 'gym_solitaire.envs.runner',
+    'EnvServer': 'gym_solitaire.envs.server',
+    'RemoteSolitaireEnv': 'gym_solitaire.envs.server',
+}
+
+
+def __getattr__(name):
+    if name in LAZY:
+        import importlib
+        return getattr(importlib.import_module(LAZY[name]), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,8 +1,10 @@
-import gym, random
+import gym, random, sys
+import numpy as np
 import gym.spaces as spaces
-from solitaire import Game
-from utility import get_card
-from pprint import pprint
+from solitaire import Game, OBSERVATION_SHAPES, HIDDEN_CARD
+from utility import decode_action, NUM_ACTIONS
+
+ARRAY_OBSERVATION_SPACE = spaces.Dict([(k, spaces.Box(0, HIDDEN_CARD, shape, np.uint8)) for k, shape in OBSERVATION_SHAPES.items()])
 
 
 class SolitaireEnv(gym.Env):
@@ -28,18 +30,61 @@ class SolitaireEnv(gym.Env):
         }),
     })
 
-    def __init__(self, env_config):
-        random.seed()
-        self.game  = Game()
-        self.round = 0
+    def __init__(self, env_config=None):
+        env_config  = env_config or {}
+        self.engine = env_config.get('engine', 'object')
+        # 'array' observations are the views returned by `Game.observation`, updated in place every step
+        self.observation_mode = env_config.get('observation', 'dict')
+        if self.observation_mode == 'array':
+            self.observation_space = ARRAY_OBSERVATION_SPACE
+        # 'full' actions are `utility.action_mapping` keys, played by `step_full`
+        self.action_mode = env_config.get('actions', 'slots')
+        if self.action_mode == 'full':
+            self.action_space = spaces.Discrete(NUM_ACTIONS)
+        # Safe foundation moves are played as part of every step that plays an action, see `auto_play`
+        self.auto = env_config.get('auto_play', False)
+        # Episodes end when the game is stuck or keeps coming back to a position, see `check_progress`
+        self.dead_ends = env_config.get('dead_ends', False)
+        self.max_repeats = env_config.get('max_repeats', 2)
+        self.seed(env_config.get('seed'))
+        # Episodes are written to the trajectory file at 'record', see `solitaire.trajectory`
+        self.recorder = None
+        if env_config.get('record'):
+            from solitaire.trajectory import Recorder
+            self.recorder = Recorder(env_config['record'])
+        self.game   = self.deal()
+        self.round  = 0
+
+    def seed(self, seed=None):
+        # Each reset deals a new game whose seed is drawn from this stream
+        self.rng = random.Random(seed)
+        return [seed]
+
+    def deal(self):
+        game = Game(seed=self.rng.getrandbits(32), engine=self.engine)
+        self.visits = {game.hash(): 1} if self.dead_ends else {}
+        # Length of the undo history before each step that played, an undo takes back a whole step, see `take_back`
+        self.steps = []
+        if self.recorder:
+            self.recorder.start(game)
+        return game
 
     def render(self, mode='human'):
         if mode == 'human':
             print(f'\nRound {self.round}', '==' * 100)
             self.game.render()
 
+    def observe(self):
+        if self.observation_mode == 'array':
+            return self.game.observation()
+        else:
+            return self.game.state()
+
     def step(self, action: object):
-        state, reward, done, info = self.game.state(), 0.0, False, {}
+        if self.action_mode == 'full':
+            return self.step_full(action)
+        reward, done, info, played = 0.0, False, {}, False
+        start = len(self.game.history)
 
         if action == 0:
             #print('Action: Ending Game')
@@ -48,14 +93,17 @@ class SolitaireEnv(gym.Env):
         elif action == 1:
             #print('Action: Drawing Cards')
             reward = self.game.get_draw_reward()
-            self.game.deck.draw()
+            self.game.draw()
+            if self.recorder:
+                self.recorder.record('draw')
+            played = True
 
         else:
             #print('Action: Moving Cards')
-            legal_moves = state['Legal Moves']
+            legal_moves = self.observe()['Legal Moves']
             try:
-                action = legal_moves[int(action) - 2]
-                if isinstance(action, tuple) and action != (0, 0):
+                action = tuple(int(c) for c in legal_moves[int(action) - 2])
+                if action != (0, 0):
                     target = self.find_card(action[0])
                     source = self.find_card(action[1])
                     move   = (target, source)
@@ -63,6 +111,9 @@ class SolitaireEnv(gym.Env):
                     if move in self.game.legal_moves():
                         reward = self.game.get_move_reward(move)
                         self.game.move_cards(move)
+                        if self.recorder:
+                            self.recorder.record(move)
+                        played = True
                     else:
                         #print('Not a legal move')
                         pass
@@ -73,20 +124,153 @@ class SolitaireEnv(gym.Env):
                 #print('Action not in action space')
                 pass
 
+        if self.auto:
+            reward += self.auto_play(played, info)
+        if played:
+            self.steps.append(start)
+        if self.dead_ends and not done:
+            done = self.check_progress(played, info)
+        self.round += 1
+        return self.observe(), reward, done, info
+
+    def step_full(self, action):
+        """
+        Parameters
+        ----------
+        action : int
+            Key of `utility.action_mapping`
+
+        Returns
+        -------
+        tuple:
+            Observation, reward, done and info, whose 'action_mask' is `action_mask()` for the next step
+
+        Notes
+        -----
+        Actions are decoded arithmetically and checked against the action mask, which comes from the same cached
+        move generation as the observation in both engines, so a step generates moves once. Illegal actions change
+        nothing.
+        """
+        reward, done, info, played = 0.0, False, {}, False
+        start = len(self.game.history)
+        index = int(action)
+        action = decode_action(index)
+        if action == 'end':
+            done = True
+        elif self.game.action_mask()[index]:
+            if action == 'draw':
+                reward = self.game.get_draw_reward()
+                self.game.draw()
+            elif action == 'undo':
+                self.take_back()
+            else:
+                action = tuple(self.find_card(n) for n in action)
+                reward = self.game.get_move_reward(action)
+                self.game.move_cards(action)
+            if self.recorder and action != 'undo':
+                self.recorder.record(action)
+            # Safe moves right after an undo would play the undone move again
+            played = action != 'undo'
+
+        if self.auto:
+            reward += self.auto_play(played, info)
+        if played:
+            self.steps.append(start)
+        if self.dead_ends and not done:
+            done = self.check_progress(played, info)
         self.round += 1
-        return self.game.state(), reward, done, info
+        info['action_mask'] = self.game.action_mask()
+        return self.observe(), reward, done, info
+
+    def check_progress(self, played, info):
+        """
+        Parameters
+        ----------
+        played : bool
+            Whether the step changed the game, steps that did not are not counted as visits
+
+        Returns
+        -------
+        bool:
+            True when the episode should end: info['dead_end'] is set when no move can ever be played again, see
+            `solitaire.pruning.dead_end`, and info['TimeLimit.truncated'] when the position was already reached
+            `max_repeats` times this episode
+        """
+        from solitaire.pruning import dead_end
+
+        visits = 0
+        if played:
+            key = self.game.hash()
+            visits = self.visits[key] = self.visits.get(key, 0) + 1
+        if dead_end(self.game):
+            # A won game cannot change either
+            info['dead_end'] = sum(self.game.heights()) < 52
+            return True
+        if visits > self.max_repeats:
+            info['TimeLimit.truncated'] = True
+            return True
+        return False
+
+    def auto_play(self, played, info):
+        """
+        Plays the safe foundation moves after an action, see `solitaire.auto_play`. An 'undo' takes them back with the
+        action, see `take_back`
+
+        Returns
+        -------
+        float:
+            Reward of the moves, their number plus the action's is reported as info['macro_length']
+        """
+        reward, moves = self.game.auto_play() if played else (0.0, [])
+        if self.recorder:
+            for move in moves:
+                self.recorder.record(move)
+        info['macro_length'] = played + len(moves)
+        return reward
+
+    def action_mask(self):
+        # Legal actions over the whole `utility.action_mapping`, see `Game.action_mask`
+        return self.game.action_mask()
+
+    def undo(self):
+        # Takes back the last step of this episode
+        if self.steps:
+            self.take_back()
+        return self.observe()
+
+    def take_back(self):
+        """
+        Undoes the last step that played, with the safe moves auto-played after it
+
+        Returns
+        -------
+        int:
+            Number of game moves and draws taken back, each recorded as an 'undo' so trajectories replay the same
+        """
+        start = self.steps.pop()
+        undone = len(self.game.history) - start
+        for x in range(undone):
+            self.game.undo()
+            if self.recorder:
+                self.recorder.record('undo')
+        return undone
 
     def find_card(self, number):
-        ranksuit = get_card(number)
-        return self.game.find_card(ranksuit[0], ranksuit[1])
+        return self.game.find_number(number)
 
     def reset(self) -> object:
-        self.game = Game()
-        return self.game.state()
+        self.game = self.deal()
+        return self.observe()
 
     def close(self):
-        pass
+        if self.recorder:
+            self.recorder.close()
+
 
+# Instrumentation can only have been turned on before this module finished importing if it was imported
+profiling = sys.modules.get('solitaire.profiling')
+if profiling is not None and profiling.enabled():
+    profiling.enable()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,210 @@
+import gym, os, traceback
+import numpy as np
+from collections import OrderedDict
+from gym_solitaire.envs.env import SolitaireEnv, ARRAY_OBSERVATION_SPACE
+from solitaire import OBSERVATION_SHAPES
+from utility import NUM_ACTIONS
+
+
+STEP, RESET, CLOSE = b'step', b'reset', b'close'
+
+
+def _views(buffers, num_envs):
+    observations = OrderedDict()
+    for k, shape in OBSERVATION_SHAPES.items():
+        observations[k] = np.frombuffer(buffers[k], np.uint8).reshape((num_envs,) + shape)
+    rewards = np.frombuffer(buffers['rewards'], np.float64)
+    dones   = np.frombuffer(buffers['dones'], np.bool_)
+    actions = np.frombuffer(buffers['actions'], np.int64)
+    # Info of the last step: 'TimeLimit.truncated', 'dead_end' and 'macro_length', -1 when unset,
+    # and, in 'full' action mode, the action mask of the position each environment is in
+    infos = OrderedDict()
+    infos['truncated']    = np.frombuffer(buffers['truncated'], np.bool_)
+    infos['dead_end']     = np.frombuffer(buffers['dead_end'], np.int8)
+    infos['macro_length'] = np.frombuffer(buffers['macro_length'], np.int64)
+    if 'action_masks' in buffers:
+        infos['action_masks'] = np.frombuffer(buffers['action_masks'], np.bool_).reshape(num_envs, NUM_ACTIONS)
+    return observations, rewards, dones, actions, infos
+
+
+def _write_info(infos, i, info, env):
+    infos['truncated'][i]    = info.get('TimeLimit.truncated', False)
+    infos['dead_end'][i]     = info.get('dead_end', -1)
+    infos['macro_length'][i] = info.get('macro_length', -1)
+    if 'action_masks' in infos:
+        infos['action_masks'][i] = env.game.action_mask()
+
+
+def _worker(conn, buffers, num_envs, start, stop, env_config, seed):
+    try:
+        observations, rewards, dones, actions, infos = _views(buffers, num_envs)
+        envs, rows = [], []
+        for i in range(start, stop):
+            # Observations are the game's own arrays, copied straight into shared memory
+            config = dict(env_config, seed=None if seed is None else seed + i, observation='array')
+            envs.append(SolitaireEnv(config))
+            rows.append(OrderedDict((k, v[i]) for k, v in observations.items()))
+
+        while True:
+            command = conn.recv_bytes()
+            if command == STEP:
+                for i, env, row in zip(range(start, stop), envs, rows):
+                    observation, rewards[i], dones[i], info = env.step(actions[i])
+                    if dones[i]:
+                        observation = env.reset()
+                    for k, v in observation.items():
+                        row[k][...] = v
+                    _write_info(infos, i, info, env)
+            elif command == RESET:
+                for i, env, row in zip(range(start, stop), envs, rows):
+                    for k, v in env.reset().items():
+                        row[k][...] = v
+                    _write_info(infos, i, {}, env)
+                rewards[start:stop] = 0.0
+                dones[start:stop] = False
+            elif command == CLOSE:
+                for env in envs:
+                    env.close()
+                conn.send_bytes(b'')
+                break
+            conn.send_bytes(b'')
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send_bytes(traceback.format_exc().encode())
+    finally:
+        conn.close()
+
+
+class RolloutRunner(gym.vector.VectorEnv):
+    """
+    Spreads `SolitaireEnv` instances over worker processes that write into shared memory
+
+    Parameters
+    ----------
+    num_envs : int
+        Number of environments, split evenly over the workers
+    num_workers : int, optional
+        Number of worker processes, one per core by default
+    env_config : dict, optional
+        Passed to every `SolitaireEnv`, with 'seed' replaced by `seed + index`
+    seed : int, optional
+        Base seed, environment `i` deals from `seed + i`. Defaults to the 'seed' of `env_config`, the environments
+        are unseeded when neither is given
+    context : str, optional
+        `multiprocessing` start method
+
+    Notes
+    -----
+    Observations, rewards, done flags, actions and infos live in preallocated shared arrays, so a step only sends a
+    short command to each worker. `reset` and `step` return views of those arrays that the next call overwrites.
+    Workers play 'array' observations whatever `env_config` says, as `EnvServer` does. Environments are reset as
+    soon as they are done, as in gym vector envs, and their infos' 'action_mask' is then the new deal's.
+    """
+
+    def __init__(self, num_envs, num_workers=None, env_config=None, seed=None, context=None):
+        env_config = env_config or {}
+        if seed is None:
+            seed = env_config.get('seed')
+        # From the config rather than a probe env, which would open the 'record' file
+        action_space = gym.spaces.Discrete(NUM_ACTIONS) if env_config.get('actions') == 'full' else SolitaireEnv.action_space
+        super().__init__(num_envs, ARRAY_OBSERVATION_SPACE, action_space)
+
+        import multiprocessing
+        ctx = multiprocessing.get_context(context)
+        num_workers = max(1, min(num_envs, num_workers or os.cpu_count() or 1))
+
+        self.buffers = OrderedDict()
+        for k, shape in OBSERVATION_SHAPES.items():
+            self.buffers[k] = ctx.RawArray('B', num_envs * int(np.prod(shape)))
+        self.buffers['rewards'] = ctx.RawArray('d', num_envs)
+        self.buffers['dones']   = ctx.RawArray('b', num_envs)
+        self.buffers['actions'] = ctx.RawArray('q', num_envs)
+        self.buffers['truncated']    = ctx.RawArray('b', num_envs)
+        self.buffers['dead_end']     = ctx.RawArray('b', num_envs)
+        self.buffers['macro_length'] = ctx.RawArray('q', num_envs)
+        if env_config.get('actions') == 'full':
+            self.buffers['action_masks'] = ctx.RawArray('b', num_envs * NUM_ACTIONS)
+        self.observations, self.rewards, self.dones, self.actions, self.infos = _views(self.buffers, num_envs)
+
+        self.conns, self.processes = [], []
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = ctx.Pipe()
+            args = (child, self.buffers, num_envs, int(start), int(stop), env_config, seed)
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def send(self, command):
+        for conn in self.conns:
+            conn.send_bytes(command)
+        for conn in self.conns:
+            reply = conn.recv_bytes()
+            if reply:
+                self.close_extras(terminate=True)
+                self.closed = True
+                raise RuntimeError(f'Worker failed:\n{reply.decode()}')
+
+    def reset(self):
+        self.send(RESET)
+        return self.observations
+
+    def reset_wait(self, **kwargs):
+        return self.reset()
+
+    def step_async(self, actions):
+        self.actions[:] = actions
+
+    def step_wait(self, **kwargs):
+        self.send(STEP)
+        return self.observations, self.rewards, self.dones, self.step_infos()
+
+    def step_infos(self):
+        """
+        Returns
+        -------
+        list:
+            The info dict of every environment's last step, with the keys `SolitaireEnv.step` set. 'action_mask' is
+            a view of shared memory
+        """
+        infos = [{} for i in range(self.num_envs)]
+        for i in np.flatnonzero(self.infos['truncated']).tolist():
+            infos[i]['TimeLimit.truncated'] = True
+        for i in np.flatnonzero(self.infos['dead_end'] >= 0).tolist():
+            infos[i]['dead_end'] = bool(self.infos['dead_end'][i])
+        for i in np.flatnonzero(self.infos['macro_length'] >= 0).tolist():
+            infos[i]['macro_length'] = int(self.infos['macro_length'][i])
+        if 'action_masks' in self.infos:
+            for info, mask in zip(infos, self.infos['action_masks']):
+                info['action_mask'] = mask
+        return infos
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close_extras(self, timeout=None, terminate=False):
+        if not terminate:
+            for conn in self.conns:
+                try:
+                    conn.send_bytes(CLOSE)
+                    conn.recv_bytes()
+                except (BrokenPipeError, EOFError, OSError):
+                    pass
+        for process in self.processes:
+            process.join(timeout if not terminate else 0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for conn in self.conns:
+            conn.close()
+        self.conns, self.processes = [], []
@@ -0,0 +1,294 @@
+import asyncio, socket, struct
+from concurrent.futures import ThreadPoolExecutor
+import gym
+import numpy as np
+from collections import OrderedDict
+from gym_solitaire.envs.env import SolitaireEnv, ARRAY_OBSERVATION_SPACE
+from solitaire import OBSERVATION_SHAPES
+from solitaire.trajectory import encode
+
+
+# Frames are a header of (request id, opcode or status, payload bytes) and the payload
+HEADER = struct.Struct('<IBI')
+OPEN, RESET, STEP, LEGAL, CLOSE = range(1, 6)
+OK, ERROR = 0, 1
+
+OBSERVATION_SIZE = sum(int(np.prod(shape)) for shape in OBSERVATION_SHAPES.values())
+STEP_DTYPE = np.dtype([('env', '<u4'), ('action', '<i4')])
+RESULT_DTYPE = np.dtype([('reward', '<f8'), ('done', 'u1')])
+NO_SEED = -1
+
+
+def decode_observations(data, n):
+    # `n` observations packed back to back, as OrderedDicts of arrays shaped like `OBSERVATION_SHAPES`
+    flat = np.frombuffer(data, np.uint8).reshape(n, OBSERVATION_SIZE)
+    observations, start = [OrderedDict() for i in range(n)], 0
+    for k, shape in OBSERVATION_SHAPES.items():
+        size = int(np.prod(shape))
+        for observation, row in zip(observations, flat[:, start:start + size]):
+            observation[k] = row.reshape(shape)
+        start += size
+    return observations
+
+
+class EnvServer:
+    """
+    Hosts `SolitaireEnv` instances for clients connected over a Unix or TCP socket
+
+    Parameters
+    ----------
+    env_config : dict, optional
+        Passed to every environment, which always uses 'array' observations
+
+    Notes
+    -----
+    Every request names the environments it applies to, so one request can step thousands of them. Requests on a
+    connection are answered in order, and clients may send more before reading the answers. Payloads:
+
+    ======  ======================================  ====================================================
+    op      request                                 response
+    ======  ======================================  ====================================================
+    OPEN    int64 seeds, -1 for none                uint32 environment ids
+    RESET   uint32 ids                              observations
+    STEP    (uint32 id, int32 action) pairs         (float64 reward, uint8 done) pairs, then observations
+    LEGAL   uint32 ids                              per id a uint16 count and uint16 `action_mapping` keys
+    CLOSE   uint32 ids                              nothing
+    ======  ======================================  ====================================================
+
+    Observations are the `OBSERVATION_SIZE` bytes of `Game.observation`. Environments are not reset when they
+    are done, as with `SolitaireEnv`, and info dicts are not sent. Failed requests are answered with an ERROR
+    status and the message. Requests are handled one at a time on a worker thread, so the event loop keeps
+    reading and writing other connections while environments step.
+    """
+
+    def __init__(self, env_config=None):
+        self.env_config = dict(env_config or {}, observation='array')
+        self.envs = {}
+        self.next_id = 0
+        self.server = None
+        self.executor = ThreadPoolExecutor(1)
+
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        """Listens on the Unix socket `path`, or on `host` and `port`, and returns the bound address"""
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.serve, path)
+        else:
+            self.server = await asyncio.start_server(self.serve, host, port)
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def serve(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                request, op, size = HEADER.unpack(await reader.readexactly(HEADER.size))
+                payload = await reader.readexactly(size)
+                try:
+                    status, reply = OK, await loop.run_in_executor(self.executor, self.handle, op, payload)
+                except Exception as e:
+                    status, reply = ERROR, f'{type(e).__name__}: {e}'.encode()
+                writer.write(HEADER.pack(request, status, len(reply)) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def handle(self, op, payload):
+        if op == OPEN:
+            ids = []
+            for seed in np.frombuffer(payload, '<i8'):
+                self.envs[self.next_id] = SolitaireEnv(dict(self.env_config, seed=None if seed == NO_SEED else int(seed)))
+                ids.append(self.next_id)
+                self.next_id += 1
+            return np.array(ids, '<u4').tobytes()
+
+        if op == STEP:
+            requests = np.frombuffer(payload, STEP_DTYPE)
+            results = np.zeros(len(requests), RESULT_DTYPE)
+            envs = [self.envs[i] for i in requests['env'].tolist()]
+            observations = []
+            for env, action, result in zip(envs, requests['action'].tolist(), results):
+                observation, reward, done, info = env.step(action)
+                result['reward'], result['done'] = reward, done
+                observations.append(env.game.buffer.tobytes())
+            return results.tobytes() + b''.join(observations)
+
+        ids = np.frombuffer(payload, '<u4').tolist()
+        envs = [self.envs[i] for i in ids]
+        if op == RESET:
+            observations = []
+            for env in envs:
+                env.reset()
+                observations.append(env.game.buffer.tobytes())
+            return b''.join(observations)
+        elif op == LEGAL:
+            reply = bytearray()
+            for env in envs:
+                codes = [encode(move) for move in env.game.legal_moves()]
+                reply += np.array([len(codes)] + codes, '<u2').tobytes()
+            return bytes(reply)
+        elif op == CLOSE:
+            # Every id was found above, and the environments are removed before any of them is closed
+            envs = [self.envs.pop(i) for i in dict.fromkeys(ids)]
+            for env in envs:
+                env.close()
+            return b''
+        raise ValueError(f'{op} is not an opcode')
+
+
+def serve(path=None, host='127.0.0.1', port=0, env_config=None):
+    """Runs an `EnvServer` until interrupted"""
+    async def main():
+        server = EnvServer(env_config)
+        print('Serving on', await server.start(path, host, port))
+        await server.server.serve_forever()
+    asyncio.run(main())
+
+
+class Client:
+    """
+    Blocking connection to an `EnvServer`
+
+    Parameters
+    ----------
+    path : str, optional
+        Unix socket of the server
+    address : tuple, optional
+        `(host, port)` of the server, when there is no `path`
+
+    Notes
+    -----
+    `submit` sends a request without waiting and `receive` returns the answers in the order they were sent, so
+    several requests can be in flight. Keep their number bounded, the server stops reading while its answers
+    are not read. The other methods send one request and wait for it.
+    """
+
+    def __init__(self, path=None, address=None):
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection(address)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.socket.makefile('rb')
+        self.next_request = 0
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def submit(self, op, payload=b''):
+        request = self.next_request
+        self.next_request = (request + 1) % 2 ** 32
+        self.socket.sendall(HEADER.pack(request, op, len(payload)) + payload)
+        self.pending.append(request)
+        return request
+
+    def receive(self):
+        request, status, size = HEADER.unpack(self.file.read(HEADER.size))
+        payload = self.file.read(size)
+        if request != self.pending.pop(0):
+            raise RuntimeError(f'Answer to request {request} out of order')
+        if status == ERROR:
+            raise RuntimeError(f'Server failed: {payload.decode()}')
+        return payload
+
+    def request(self, op, payload=b''):
+        if self.pending:
+            raise RuntimeError(f'{len(self.pending)} submitted requests have not been received')
+        self.submit(op, payload)
+        return self.receive()
+
+    def open(self, seeds):
+        seeds = [NO_SEED if seed is None else seed for seed in seeds]
+        return np.frombuffer(self.request(OPEN, np.array(seeds, '<i8').tobytes()), '<u4').tolist()
+
+    def reset(self, ids):
+        return decode_observations(self.request(RESET, np.array(ids, '<u4').tobytes()), len(ids))
+
+    def step(self, ids, actions):
+        """
+        Returns
+        -------
+        tuple:
+            Observations, rewards and done flags of the environments `ids` after playing `actions`
+        """
+        requests = np.zeros(len(ids), STEP_DTYPE)
+        requests['env'], requests['action'] = ids, actions
+        payload = self.request(STEP, requests.tobytes())
+        results = np.frombuffer(payload[:len(ids) * RESULT_DTYPE.itemsize], RESULT_DTYPE)
+        observations = decode_observations(payload[len(ids) * RESULT_DTYPE.itemsize:], len(ids))
+        return observations, results['reward'].copy(), results['done'].astype(bool)
+
+    def legal_moves(self, ids):
+        # `action_mapping` keys of the legal moves of every environment
+        data, i, moves = np.frombuffer(self.request(LEGAL, np.array(ids, '<u4').tobytes()), '<u2'), 0, []
+        for x in ids:
+            n = int(data[i])
+            moves.append(data[i + 1:i + 1 + n].tolist())
+            i += 1 + n
+        return moves
+
+    def close_envs(self, ids):
+        self.request(CLOSE, np.array(ids, '<u4').tobytes())
+
+
+class RemoteSolitaireEnv(gym.Env):
+    """
+    `SolitaireEnv` with 'array' observations, played on an `EnvServer` through a `Client`
+
+    Parameters
+    ----------
+    client : Client
+        Connection, which may be shared by many environments
+    seed : int, optional
+    action_space : gym.Space, optional
+        The server's, `SolitaireEnv.action_space` unless it plays 'full' actions
+    """
+
+    observation_space = ARRAY_OBSERVATION_SPACE
+
+    def __init__(self, client, seed=None, action_space=SolitaireEnv.action_space):
+        self.client = client
+        self.action_space = action_space
+        self.id, = client.open([seed])
+
+    def reset(self):
+        return self.client.reset([self.id])[0]
+
+    def step(self, action):
+        observations, rewards, dones = self.client.step([self.id], [action])
+        return observations[0], float(rewards[0]), bool(dones[0]), {}
+
+    def legal_moves(self):
+        return self.client.legal_moves([self.id])[0]
+
+    def close(self):
+        if self.id is not None:
+            self.client.close_envs([self.id])
+            self.id = None
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m gym_solitaire.envs.server', description='Hosts SolitaireEnvs')
+    parser.add_argument('--path', help='Unix socket to listen on')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--engine', choices=('object', 'array'), default='object')
+    args = parser.parse_args()
+    serve(args.path, args.host, args.port, {'engine': args.engine})
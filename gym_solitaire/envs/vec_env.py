@@ -0,0 +1,301 @@
+import gym, random
+import numpy as np
+from collections import OrderedDict
+from gym_solitaire.envs.env import SolitaireEnv, ARRAY_OBSERVATION_SPACE
+from solitaire import OBSERVATION_SHAPES, TABLEAU_CHILDREN, FOUNDATION_CHILDREN, EMPTY_TABLEAU, FOUNDATION_BASES, HIDDEN_CARD
+from solitaire import write_row, deal_order, ActionMask, move_rewards, FROM_TABLEAU, FROM_FOUNDATION, FROM_WASTE
+from utility import encode_actions, NUM_ACTIONS
+
+
+DEPTH = OBSERVATION_SHAPES['Tableaus'][1]
+SLOTS = OBSERVATION_SHAPES['Legal Moves'][0]
+GONE, STOCK, WASTE = 0, 1, 2
+MAX_REBUILDS = 3
+
+# Source columns of the move table: tableau slots, then foundation tops, then the waste top
+FOUNDATION_COLUMN = 7 * DEPTH
+WASTE_COLUMN = FOUNDATION_COLUMN + 4
+SOURCE_COLUMNS = WASTE_COLUMN + 1
+
+# Where `Game.__init__` deals the first 28 cards of a shuffled deck
+DEAL_PILES = np.array([i for i in range(7) for j in range(i + 1)])
+DEAL_SLOTS = np.array([j for i in range(7) for j in range(i + 1)])
+
+
+def _legal_table(children):
+    table = np.zeros((EMPTY_TABLEAU + 2, EMPTY_TABLEAU + 2), bool)
+    for target, cards in enumerate(children):
+        table[target, list(cards)] = True
+    return table
+
+TABLEAU_LEGAL = _legal_table(TABLEAU_CHILDREN)
+FOUNDATION_LEGAL = _legal_table(FOUNDATION_CHILDREN)
+BASES = np.array(FOUNDATION_BASES)
+SUIT_OFFSETS = np.arange(4) * 13
+
+
+def encode_observation(game_state, out=None):
+    """
+    Parameters
+    ----------
+    game_state : OrderedDict
+        Observation returned by `Game.state` or `Game.observation`
+    out : OrderedDict, optional
+        Arrays shaped like `OBSERVATION_SHAPES` to write into, new ones are allocated otherwise
+
+    Returns
+    -------
+    OrderedDict:
+        `uint8` arrays, with tableaus and legal moves cut down to the fixed layout
+    """
+    if out is None:
+        out = OrderedDict((k, np.zeros(shape, np.uint8)) for k, shape in OBSERVATION_SHAPES.items())
+
+    for key, value in game_state.items():
+        if isinstance(value, dict):
+            value = list(value.values())
+        if key == 'Tableaus':
+            for row, t in zip(out[key], value):
+                write_row(row, t)
+        else:
+            write_row(out[key], value)
+    return out
+
+
+class VecSolitaireEnv(gym.vector.VectorEnv):
+    """
+    Steps `num_envs` games at once, each held as a row of stacked NumPy arrays
+
+    Notes
+    -----
+    Actions and observations follow `SolitaireEnv` per game: 0 ends the game, 1 draws and 2-7 play the matching
+    slot of 'Legal Moves'. Observations are the `OBSERVATION_SHAPES` arrays stacked over games. Games that end are
+    dealt again straight away and their row of the returned observation is the new deal, as in gym vector envs.
+    Deal `n` of the batch is the same deal as `Game(seed=int(env.seeds[n]))`.
+    """
+
+    def __init__(self, num_envs, seed=None):
+        super().__init__(num_envs, ARRAY_OBSERVATION_SPACE, SolitaireEnv.action_space)
+
+        n = num_envs
+        self.rows = np.arange(n)
+        self.seeds = np.zeros(n, np.int64)
+
+        # Tableau cards from the bottom up, the first `hidden` of them face down
+        self.tableaus = np.zeros((n, 7, DEPTH), np.int64)
+        self.lengths = np.zeros((n, 7), np.int64)
+        self.hidden = np.zeros((n, 7), np.int64)
+        # Number of cards on each foundation
+        self.foundations = np.zeros((n, 4), np.int64)
+        # The 24 undealt cards in their shuffled order, with where each one is and when it was drawn
+        self.deck = np.zeros((n, 24), np.int64)
+        self.status = np.zeros((n, 24), np.int8)
+        self.drawn = np.zeros((n, 24), np.int64)
+        self.seen = np.zeros((n, 24), bool)
+        self.draws = np.zeros(n, np.int64)
+        self.times_rebuilt = np.zeros(n, np.int64)
+
+        # Legal actions over `utility.action_mapping`, see `action_masks`
+        self.masks = np.zeros((n, NUM_ACTIONS), bool)
+        self.masks[:, ActionMask.END] = True
+        self.masked = (np.zeros(0, np.int64), np.zeros(0, np.int64))
+
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self.rng = random.Random(seed)
+        return [seed]
+
+    def reset(self):
+        self.deal(self.rows)
+        return self.observe()
+
+    def reset_wait(self, **kwargs):
+        return self.reset()
+
+    def step_async(self, actions):
+        self.actions = actions
+
+    def step_wait(self, **kwargs):
+        return self.step(self.actions)
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        rewards = np.zeros(self.num_envs)
+        dones = actions == 0
+
+        draw = actions == 1
+        empty = (self.status == STOCK).sum(1) == 0
+        rewards[draw & empty & (self.times_rebuilt >= MAX_REBUILDS)] = -20.0
+        self.draw(np.nonzero(draw & ~empty)[0])
+        self.rebuild(np.nonzero(draw & empty)[0])
+
+        slots = np.clip(actions - 2, 0, SLOTS - 1)
+        move = (actions >= 2) & (actions - 2 < SLOTS) & (self.slot_targets[self.rows, slots] >= 0)
+        rows = np.nonzero(move)[0]
+        rewards[rows] = self.move(rows, slots[rows])
+
+        self.deal(np.nonzero(dones)[0])
+        # One info dict per game, as gym vector envs return
+        return self.observe(), rewards, dones, [{} for n in range(self.num_envs)]
+
+    def close_extras(self, **kwargs):
+        pass
+
+    def deal(self, rows):
+        if len(rows) == 0:
+            return
+
+        seeds = [self.rng.getrandbits(32) for r in rows]
+        orders = np.array([deal_order(seed) for seed in seeds])
+
+        self.seeds[rows] = seeds
+        self.tableaus[rows[:, None], DEAL_PILES, DEAL_SLOTS] = orders[:, :28]
+        self.lengths[rows] = np.arange(1, 8)
+        self.hidden[rows] = np.arange(7)
+        self.foundations[rows] = 0
+        self.deck[rows] = orders[:, 28:]
+        self.status[rows] = STOCK
+        self.drawn[rows] = 0
+        self.seen[rows] = False
+        self.draws[rows] = 0
+        self.times_rebuilt[rows] = 0
+
+    def draw(self, rows):
+        stock = self.status[rows] == STOCK
+        taken = stock & (np.cumsum(stock, 1) <= 3)
+        self.draws[rows] += 1
+        self.status[rows] = np.where(taken, WASTE, self.status[rows])
+        self.drawn[rows] = np.where(taken, self.draws[rows, None], self.drawn[rows])
+        self.seen[rows] |= taken
+
+    def rebuild(self, rows):
+        self.status[rows] = np.where(self.status[rows] == WASTE, STOCK, self.status[rows])
+        self.times_rebuilt[rows] += 1
+
+    def move(self, rows, slots):
+        targets = self.slot_targets[rows, slots]
+        columns = self.slot_sources[rows, slots]
+        cards = self.sources[rows, columns]
+
+        from_tableau = columns < FOUNDATION_COLUMN
+        from_foundation = (columns >= FOUNDATION_COLUMN) & (columns < WASTE_COLUMN)
+        from_waste = columns == WASTE_COLUMN
+        to_tableau = targets < 7
+        piles, index = columns // DEPTH, columns % DEPTH
+        # An empty tableau target resolves to the first empty tableau, like `Game.find_card`
+        first_empty = np.argmax(self.lengths[rows] == 0, 1)
+        targets = np.where(self.target_cards[rows, targets] == EMPTY_TABLEAU, first_empty, targets)
+
+        revealed = from_tableau & (index > 0) & (index == self.hidden[rows, np.minimum(piles, 6)])
+        origins = np.where(from_tableau, FROM_TABLEAU, np.where(from_foundation, FROM_FOUNDATION, FROM_WASTE))
+        rewards = move_rewards(cards, ~to_tableau, origins, revealed)
+
+        # Take the cards off their source
+        counts = np.ones(len(rows), np.int64)
+        moved = np.zeros((len(rows), 13), np.int64)
+        moved[:, 0] = cards
+
+        r, p, i = rows[from_tableau], piles[from_tableau], index[from_tableau]
+        counts[from_tableau] = self.lengths[r, p] - i
+        for j in range(1, 13):
+            moved[from_tableau, j] = self.tableaus[r, p, np.minimum(i + j, DEPTH - 1)]
+        self.lengths[r, p] = i
+        self.hidden[r, p] = np.minimum(self.hidden[r, p], np.maximum(i - 1, 0))
+
+        r, f = rows[from_foundation], columns[from_foundation] - FOUNDATION_COLUMN
+        self.foundations[r, f] -= 1
+
+        r = rows[from_waste]
+        self.status[r, self.waste_top[r]] = GONE
+
+        # Put them on the target
+        r, q, k, c = rows[to_tableau], targets[to_tableau], counts[to_tableau], moved[to_tableau]
+        for j in range(13):
+            m = j < k
+            self.tableaus[r[m], q[m], self.lengths[r[m], q[m]] + j] = c[m, j]
+        self.lengths[r, q] += k
+
+        r, g = rows[~to_tableau], targets[~to_tableau] - 7
+        self.foundations[r, g] += 1
+
+        return rewards
+
+    def observe(self):
+        n, rows = self.num_envs, self.rows
+        depth = np.arange(DEPTH)
+        on_table = depth < self.lengths[:, :, None]
+        face_up = on_table & (depth >= self.hidden[:, :, None])
+        is_top = depth == self.lengths[:, :, None] - 1
+
+        tableaus = np.zeros((n, 7, DEPTH), np.uint8)
+        tableaus[:, :, 0] = EMPTY_TABLEAU
+        tableaus[:, :, 1:] = np.where(face_up, self.tableaus, np.where(on_table, HIDDEN_CARD, 0))[:, :, :-1]
+
+        foundations = np.where(self.foundations > 0, SUIT_OFFSETS + self.foundations, BASES)
+
+        positions = np.arange(24)
+        stock = self.status == STOCK
+        order = np.argsort(~stock, 1, kind='stable')
+        deck = np.take_along_axis(np.where(self.seen, self.deck, HIDDEN_CARD), order, 1)
+        deck[positions >= stock.sum(1)[:, None]] = 0
+
+        waste = self.status == WASTE
+        order = np.argsort(np.where(waste, positions - self.drawn * 32, 32), 1, kind='stable')
+        waste_cards = np.take_along_axis(self.deck, order, 1)
+        waste_cards[positions >= waste.sum(1)[:, None]] = 0
+        self.waste_top = order[:, 0]
+
+        # Move table of targets (tableau tops, then foundation tops) against every face up source
+        tops = np.where(self.lengths > 0, self.tableaus[rows[:, None], np.arange(7), np.maximum(self.lengths - 1, 0)], EMPTY_TABLEAU)
+        self.target_cards = np.concatenate([tops, foundations], 1)
+        self.sources = np.concatenate([
+            np.where(face_up, self.tableaus, 0).reshape(n, -1),
+            np.where(self.foundations > 0, foundations, 0),
+            waste_cards[:, :1]
+        ], 1)
+        top_sources = self.sources * np.concatenate([is_top.reshape(n, -1), np.ones((n, 5), bool)], 1)
+        legal = self.legal = np.concatenate([
+            TABLEAU_LEGAL[tops[:, :, None], self.sources[:, None, :]],
+            FOUNDATION_LEGAL[foundations[:, :, None], top_sources[:, None, :]]
+        ], 1).reshape(n, -1)
+
+        # First `SLOTS` legal moves in `Game.legal_moves` order
+        counts = np.cumsum(legal, 1)
+        r, columns = np.nonzero(legal & (counts <= SLOTS))
+        slots = counts[r, columns] - 1
+        self.slot_targets = np.full((n, SLOTS), -1)
+        self.slot_sources = np.full((n, SLOTS), -1)
+        self.slot_targets[r, slots] = columns // SOURCE_COLUMNS
+        self.slot_sources[r, slots] = columns % SOURCE_COLUMNS
+        legal_moves = np.zeros((n, SLOTS, 2), np.uint8)
+        legal_moves[r, slots, 0] = self.target_cards[r, columns // SOURCE_COLUMNS]
+        legal_moves[r, slots, 1] = self.sources[r, columns % SOURCE_COLUMNS]
+
+        observation = OrderedDict()
+        observation['Deck'] = deck.astype(np.uint8)
+        observation['Foundations'] = foundations.astype(np.uint8)
+        observation['Legal Moves'] = legal_moves
+        observation['Tableaus'] = tableaus
+        observation['Waste'] = waste_cards.astype(np.uint8)
+        return observation
+
+    def action_masks(self):
+        """
+        Returns
+        -------
+        numpy.ndarray:
+            `(num_envs, NUM_ACTIONS)` booleans, the `Game.action_mask` of every game as of the last observation,
+            shared between calls and updated in place
+
+        Notes
+        -----
+        Games here cannot be taken back, so 'undo' is never legal.
+        """
+        r, columns = np.nonzero(self.legal)
+        codes = encode_actions(self.target_cards[r, columns // SOURCE_COLUMNS], self.sources[r, columns % SOURCE_COLUMNS])
+        self.masks[self.masked] = False
+        self.masks[r, codes] = True
+        self.masked = (r, codes)
+        self.masks[:, ActionMask.DRAW] = (self.status != GONE).any(1)
+        return self.masks
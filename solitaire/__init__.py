@@ -0,0 +1,2011 @@
+from collections import OrderedDict
+from utility import get_number, get_card, cards_mapping, encode_action, NUM_ACTIONS
+import random, itertools, os
+
+# Rendering imports `colors` and `pprint`, and observation buffers `numpy`, the first time they are used, so
+# headless workers that only step games import nothing else
+
+
+EMPTY  = 0
+HIDDEN = 64
+HIDDEN_CARD = 58
+GLYPHS = {'s': '\u2660', 'h': '\u2665', 'd': '\u2666', 'c': '\u2663'}
+SUITS  = ('s', 'h', 'c', 'd')
+RANKS  = ('A', '2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K')
+LOCATIONS = ('tableau', 'foundation', 'deck', 'waste')
+ENGINES = ('object', 'array')
+OBSERVATION_SHAPES = OrderedDict([
+    ('Deck', (24,)),
+    ('Foundations', (4,)),
+    ('Legal Moves', (8, 2)),
+    ('Tableaus', (7, 19)),
+    ('Waste', (24,))
+])
+FOUNDATION_SCORES = {
+    'A': 100.0,
+    '2': 90.0,
+    '3': 80.0,
+    '4': 70.0,
+    '5': 60.0,
+    '6': 50.0,
+    '7': 40.0,
+    '8': 30.0,
+    '9': 20.0,
+    'T': 10.0,
+    'J': 10.0,
+    'Q': 10.0,
+    'K': 10.0
+}
+NUMBERS = {card: number for number, card in cards_mapping.items()}
+MASK = 2 ** 64 - 1
+GOLDEN = 0x9e3779b97f4a7c15
+DECK_NUMBERS = list(range(1, 53))
+
+
+def get_opposite_suits(suit: str):
+    if suit in ('s', 'c'):
+        return 'h', 'd'
+    elif suit in ('h', 'd'):
+        return 's', 'c'
+    else:
+        raise ValueError(f'{suit} is not in {SUITS}')
+
+def cards_product(ranks, suits):
+    cards = []
+    for s in suits:
+        for r in ranks:
+            cards.append(Card(r, s))
+    return cards
+
+def set_container(items, container):
+    for i in items:
+        i.container = container
+
+def get_parent_card(card):
+    # Really only used to tell if the parent is hidden and will be revealed upon a move
+    # This is used to increase score for revealing hidden cards
+    # Only works for cards in Tableaus
+    container = card.container
+    if isinstance(container, Tableau):
+        card_index = container.index(card)
+        parent_card = container.cards[card_index - 1]
+        return parent_card
+
+def padded(values, fillvalue, n):
+    # `more_itertools.padded` for lists: pads with `fillvalue` up to `n` items, never truncates
+    values = list(values)
+    values.extend([fillvalue] * (n - len(values)))
+    return values
+
+def observation_buffer():
+    """
+    Returns
+    -------
+    tuple:
+        A flat `uint8` array and an OrderedDict of named views into it shaped like `OBSERVATION_SHAPES`
+    """
+    import numpy as np
+    sizes  = [int(np.prod(shape)) for shape in OBSERVATION_SHAPES.values()]
+    buffer = np.zeros(sum(sizes), np.uint8)
+    views  = OrderedDict()
+    offset = 0
+    for (key, shape), size in zip(OBSERVATION_SHAPES.items(), sizes):
+        views[key] = buffer[offset:offset + size].reshape(shape)
+        offset += size
+    return buffer, views
+
+def write_row(row, values):
+    # Copies `values` into a fixed width view, padding with EMPTY and dropping what does not fit
+    n = min(len(values), len(row))
+    if n:
+        row[:n] = values[:n]
+    row[n:] = EMPTY
+
+def zobrist_table(rows, columns, seed):
+    # Random 64 bit keys, fixed by `seed` so hashes agree between processes and engines
+    rng = random.Random(seed)
+    return tuple(tuple(rng.getrandbits(64) for c in range(columns)) for r in range(rows))
+
+# Keys by card id and slot: tableau slots count up from the empty card, stock slots from the bottom of the stock
+# and waste slots from the bottom of the waste, so pushing or popping a card leaves the other keys alone
+ZOBRIST_SLOTS = 52
+TABLEAU_KEYS = zobrist_table(len(cards_mapping) + 1, ZOBRIST_SLOTS, 1)
+STOCK_KEYS = zobrist_table(len(cards_mapping) + 1, ZOBRIST_SLOTS, 2)
+WASTE_KEYS = zobrist_table(len(cards_mapping) + 1, ZOBRIST_SLOTS, 3)
+FOUNDATION_KEYS, HIDDEN_KEYS = zobrist_table(2, len(cards_mapping) + 1, 4)
+
+def rotate(key, n):
+    n %= 64
+    return ((key << n) | (key >> (64 - n))) & MASK
+
+def mix(key):
+    # splitmix64 finalizer, maps 0 to 0 so empty tableaus drop out of canonical hashes
+    key = ((key ^ (key >> 30)) * 0xbf58476d1ce4e5b9) & MASK
+    key = ((key ^ (key >> 27)) * 0x94d049bb133111eb) & MASK
+    return key ^ (key >> 31)
+
+def combine_hashes(tableaus, others, canonical=False):
+    """
+    Parameters
+    ----------
+    tableaus : list
+        Zobrist hashes of the seven tableaus
+    others : list
+        Zobrist hashes of the foundations, stock and waste
+    canonical : bool, optional
+        Ignore which tableau holds which pile, so positions that only differ by the order of the tableaus (or of
+        their empty columns) share a hash
+
+    Returns
+    -------
+    int:
+        64 bit position hash
+    """
+    key = 0
+    for h in others:
+        key ^= h
+    if canonical:
+        key ^= sum(mix(h) for h in tableaus) & MASK
+    else:
+        for i, h in enumerate(tableaus):
+            key ^= rotate(h, 9 * i)
+    return key
+
+def rollout(game, depth, rng=random):
+    """
+    Plays up to `depth` uniformly random moves and draws on `game`, then takes them back with `undo`
+
+    Parameters
+    ----------
+    game : Game or ArrayGame
+    depth : int
+        Most actions to play
+    rng : random.Random, optional
+        Source of the random choices
+
+    Returns
+    -------
+    float:
+        Sum of `get_move_reward` and `get_draw_reward` over the actions played
+    """
+    total, played = 0.0, 0
+    for x in range(depth):
+        moves = game.legal_moves()
+        n = len(moves) + game.can_draw()
+        if not n:
+            break
+        i = rng.randrange(n)
+        if i < len(moves):
+            total += game.get_move_reward(moves[i])
+            game.move_cards(moves[i])
+        else:
+            total += game.get_draw_reward()
+            game.draw()
+        played += 1
+    for x in range(played):
+        game.undo()
+    return total
+
+def deal_seed(seed, index):
+    """
+    Parameters
+    ----------
+    seed : int
+        Seed of a stream of deals
+    index : int
+        Place of the deal in the stream
+
+    Returns
+    -------
+    int:
+        64 bit seed of deal `index`, for `Game(seed=...)`
+
+    Notes
+    -----
+    The stream is splitmix64 started from `seed`, which jumps straight to any index, so workers can take disjoint
+    ranges of the same stream without generating or coordinating over the deals before theirs.
+    """
+    return mix((seed + (index + 1) * GOLDEN) & MASK)
+
+def deal_order(seed):
+    # Card ids in stock order before dealing, the shuffle `Deck.shuffle` makes for `seed`
+    order = list(DECK_NUMBERS)
+    random.Random(seed).shuffle(order)
+    return order
+
+def validate_deal(deal):
+    # A deal lists every card id from 1 to 52 once, in stock order before dealing
+    order = [int(n) for n in deal]
+    if sorted(order) != DECK_NUMBERS:
+        raise ValueError(f'{order} is not an order of the card ids 1 to 52')
+    return order
+
+def deals(seed, start=0, stop=None, engine='object'):
+    """Yields `(index, game)` for deals `start` up to `stop`, or forever, of the stream of `deal_seed(seed, index)`"""
+    indices = itertools.count(start) if stop is None else range(start, stop)
+    for index in indices:
+        yield index, Game(seed=deal_seed(seed, index), engine=engine)
+
+class ActionMask:
+    """
+    Boolean mask over the `utility.action_mapping` keys a game can play, kept up to date in place
+
+    Notes
+    -----
+    'end' is always on, 'draw' while the stock or waste has cards and 'undo' while there is something to take
+    back. Moves are only encoded again when the `key` they were generated from changed, and then only the entries
+    of moves that came or went are written.
+    """
+
+    DRAW, UNDO, END = (encode_action(a) for a in ('draw', 'undo', 'end'))
+
+    def __init__(self):
+        import numpy as np
+        self.mask = np.zeros(NUM_ACTIONS, bool)
+        self.mask[self.END] = True
+        self.codes = set()
+        self.key = None
+
+    def update(self, key, moves, can_draw, can_undo):
+        """
+        Parameters
+        ----------
+        key : object
+            Compared with the last `key`, the moves are encoded again when it differs
+        moves : callable
+            Returns the `(target, source)` card id pairs of the legal moves
+        can_draw, can_undo : bool
+
+        Returns
+        -------
+        numpy.ndarray:
+            The mask, shared between calls
+        """
+        if key != self.key:
+            self.key = key
+            codes = {encode_action(move) for move in moves()}
+            self.mask[list(self.codes - codes)] = False
+            self.mask[list(codes - self.codes)] = True
+            self.codes = codes
+        self.mask[self.DRAW], self.mask[self.UNDO] = can_draw, can_undo
+        return self.mask
+
+def print_observation(game_state: OrderedDict):
+    print()
+    print('OBSERVATION')
+    print('DECK:       ', game_state['Deck'])
+    print('WASTE:      ', game_state['Waste'])
+    print('FOUNDATIONS:', list(game_state['Foundations'].items()))
+    print('LEGAL MOVES:', game_state['Legal Moves'])
+    print('TABLEAUS:')
+    for t in game_state['Tableaus'].items():
+        print(t)
+
+
+
+class Card:
+
+    def __init__(self, rank: str = None, suit: str = None, location: str = 'deck', hidden: bool = False, container: object = None):
+        """
+        Parameters
+        ----------
+        rank : str, optional
+            Indicates the rank of the card as an uppercase character
+        suit : str, optional
+            Indicates the suit of the card as a lowercase character
+        hidden : bool, optional
+            Indicates the card is hidden, it cannot be a target or a source for a move
+
+        Notes
+        -----
+        `card = Card()` is a tableau card, it can only be a target. Only kings can be placed on it.
+        `card = Card(suit='h')` is a foundation card, it can only be a target. Only aces of the same suit can be placed on it.
+        """
+
+        # Validating `rank` argument
+        if (rank in RANKS) or (rank is None): self.rank = rank
+        else: raise ValueError(f'{rank} is not in {RANKS} or None')
+
+        # Validating `suit` argument
+        if (suit in SUITS) or (suit is None): self.suit = suit
+        else: raise ValueError(f'{suit} is not in {SUITS} or None')
+
+        # Validating `location` argument
+        if location in LOCATIONS:
+            self.location = location
+        else:
+            raise ValueError(f'{location} is not in {LOCATIONS}')
+
+        # Overwrite location if suit or empty card
+        if not self.suit and not self.rank:
+            self.location = 'tableau'
+        elif not self.rank:
+            self.location = 'foundation'
+
+        self.hidden = hidden
+        self.container = container
+        self.number = NUMBERS.get((self.rank, self.suit))
+        # Index in `container.cards`, kept by tableaus and foundations
+        self.position = None
+
+        '''
+        # Ensuring that only normal cards can be hidden
+        if rank and suit: self.hidden = hidden
+        else: self.hidden = False
+        '''
+
+    def __hash__(self):
+        """
+        Returns
+        -------
+        int:
+            An integer representing the card,
+        """
+        return hash((self.rank, self.suit, self.hidden))
+
+    def __eq__(self, other):
+        try:
+            if (self.rank == other.rank) and (self.suit == other.suit) and (self.hidden == other.hidden):
+                return True
+        except AttributeError:
+            return False
+
+    def __ne__(self, other):
+        try:
+            if (self.rank != other.rank) or (self.suit != other.suit) or (self.hidden != other.hidden):
+                return True
+        except AttributeError:
+            return False
+
+    def __repr__(self):
+        if self.hidden:
+            return chr(int("0001F0A0", base=16))
+
+        elif not self.suit and not self.rank:
+            return chr(int("0001F0E0", base=16))
+
+        elif self.suit:
+            from colors import color
+            if self.rank:
+                string = f"{self.rank}{GLYPHS[self.suit]}"
+            else:
+                string = f"{GLYPHS[self.suit]}"
+
+            if self.suit in ('s', 'c'):
+                return color(string, 'darkgray')
+            elif self.suit in ('h', 'd'):
+                return color(string, 'red')
+
+    def allowable_children(self) -> list:
+        if self.location == 'tableau':
+            if self.rank:
+                if self.rank == 'A':
+                    # In the tableau, aces have no children
+                    return []
+                else:
+                    # In the tableau, children are of the opposite color and one rank lower
+                    child_rank  = RANKS[RANKS.index(self.rank) - 1]
+                    child_suits = get_opposite_suits(self.suit)
+            else:
+                # In the tableau, any king can be placed on an empty card
+                child_rank  = 'K'
+                child_suits = SUITS
+
+        elif self.location == 'foundation':
+            if self.rank:
+                if self.rank == 'K':
+                    # In the foundation, kings have no children
+                    return []
+                else:
+                    # In the foundation, children are of the same suit and one rank higher
+                    child_rank  = RANKS[RANKS.index(self.rank) + 1]
+                    child_suits = self.suit
+            else:
+                # In the foundation, only an ace of the same suit can be placed on a suit card
+                child_rank  = 'A'
+                child_suits = self.suit
+
+        else:
+            return []
+
+        cards = cards_product(child_rank, child_suits)
+        return cards
+
+    def dump(self):
+        if self.hidden:
+            return HIDDEN_CARD
+        else:
+            return self.number
+
+class Deck:
+    """
+    Notes
+    -----
+    The stock and waste share `talon`, the deck's cards in stock order: the waste is `talon[:cursor]` and the
+    stock the rest. Drawing moves `cursor` forward and rebuilding puts it back to 0, so the talon never needs
+    sorting. `starts` holds where each draw begins, the top of the waste being the first card of the last draw.
+    `cards` and `waste` are tuples built from these, top first, change the deck through `deal`, `draw`, `pop` and
+    `push`.
+    """
+
+    def __init__(self, hidden=True, seed=0):
+        self.seed  = seed
+        # Every deck shuffles with its own generator, leaving the `random` module's state alone
+        self.rng   = random.Random(seed)
+        self.talon = []
+        self.cursor = 0
+        self.starts = []
+        self.order = None
+        self.times_rebuilt = 0
+        self.version = 0
+        # Undo entries for draws and rebuilds are appended here when a Game shares its history
+        self.history = None
+        for s in SUITS:
+            for r in RANKS:
+                self.talon.append(Card(r, s, hidden=True, container=self))
+        # Every card the deck was made with, by (rank, suit), see `find`
+        self.lookup = {(c.rank, c.suit): c for c in self.talon}
+        self.indices = self.index_order(self.talon)
+        self.refresh()
+        self.rehash()
+
+    def __repr__(self):
+        return str(self.cards)
+
+    @property
+    def cards(self):
+        # The stock, from the next card to draw, see `stock_size` and `iter_stock` to avoid building it
+        return tuple(self.talon[self.cursor:])
+
+    @property
+    def waste(self):
+        # The waste from the top, the last draw first, see `waste_size`, `top` and `iter_waste`
+        return tuple(self.iter_waste())
+
+    def stock_size(self):
+        return len(self.talon) - self.cursor
+
+    def waste_size(self):
+        return self.cursor
+
+    def iter_stock(self):
+        talon = self.talon
+        for i in range(self.cursor, len(talon)):
+            yield talon[i]
+
+    def waste_slots(self):
+        # Talon index and waste slot of every waste card, slots count up from the bottom of the waste and a draw's
+        # first card has the highest of its slots
+        starts = self.starts
+        for k, start in enumerate(starts):
+            end = starts[k + 1] if k + 1 < len(starts) else self.cursor
+            for i in range(start, end):
+                yield i, start + end - 1 - i
+
+    def iter_waste(self):
+        talon, end = self.talon, self.cursor
+        for k in range(len(self.starts) - 1, -1, -1):
+            start = self.starts[k]
+            for i in range(start, end):
+                yield talon[i]
+            end = start
+
+    @staticmethod
+    def index_order(cards):
+        # Place of every card id in `cards`
+        indices = [None] * (len(cards_mapping) + 1)
+        for i, c in enumerate(cards):
+            indices[c.number] = i
+        return indices
+
+    def shuffle(self):
+        self.rng.seed(self.seed)
+        self.rng.shuffle(self.talon)
+        self.arrange(self.talon)
+
+    def arrange(self, cards):
+        # Puts `cards`, the deck's own Card objects, in the stock in that order, top first
+        self.version += 1
+        self.talon = list(cards)
+        self.order = self.talon[:]
+        self.indices = self.index_order(self.order)
+        self.rehash()
+
+    def deal(self, num=1):
+        if self.cursor == len(self.talon):
+            self.rebuild()
+        start, n = self.cursor, len(self.talon)
+        dealt = self.talon[start:start + num]
+        for i, c in enumerate(dealt, start):
+            self.hash ^= self.stock_key(c, n - 1 - i)
+        del self.talon[start:start + num]
+        self.version += 1
+        return dealt
+
+    def rebuild(self):
+        if self.history is not None:
+            self.history.append(('rebuild', self.cursor, tuple(self.starts)))
+        self.version += 1
+        # Only the waste's cards change keys, the stock keeps its slots as the talon's length does not change
+        talon, n = self.talon, len(self.talon)
+        for i, slot in self.waste_slots():
+            self.hash ^= WASTE_KEYS[talon[i].number][slot] ^ self.stock_key(talon[i], n - 1 - i)
+        self.cursor = 0
+        self.starts.clear()
+        self.times_rebuilt += 1
+
+    def draw(self):
+        talon, start = self.talon, self.cursor
+        if start < len(talon):
+            stop, n = min(start + 3, len(talon)), len(talon)
+            if self.history is not None:
+                self.history.append(('draw', tuple(talon[i].hidden for i in range(start, stop))))
+            for i in range(start, stop):
+                c = talon[i]
+                self.hash ^= self.stock_key(c, n - 1 - i)
+                c.hidden = False
+                # Waste slots count up from the bottom of the waste, which the new cards go on top of
+                self.hash ^= WASTE_KEYS[c.number][stop - 1 - (i - start)]
+            self.cursor = stop
+            self.starts.append(start)
+            self.version += 1
+        else:
+            self.rebuild()
+
+    def undo(self, entry):
+        # Reverts a 'draw' or 'rebuild' history entry
+        self.version += 1
+        if entry[0] == 'draw':
+            hidden = entry[1]
+            start  = self.starts.pop()
+            for c, h in zip(self.talon[start:start + len(hidden)], hidden):
+                c.hidden = h
+            self.cursor = start
+        else:
+            self.cursor, self.starts = entry[1], list(entry[2])
+            self.times_rebuilt -= 1
+        self.rehash()
+
+    def top(self):
+        # Raises IndexError when the waste is empty
+        return self.talon[self.starts[-1]]
+
+    def sources(self):
+        return [self.top()]
+
+    def pop(self):
+        self.version += 1
+        start = self.starts[-1]
+        c = self.talon.pop(start)
+        self.cursor -= 1
+        if start == self.cursor:
+            self.starts.pop()
+        self.hash ^= WASTE_KEYS[c.number][self.cursor]
+        return c
+
+    def push(self, card):
+        # Puts a card taken off the top of the waste back, inside its draw if any of that draw is left
+        self.version += 1
+        if self.starts and self.indices[card.number] < self.indices[self.top().number]:
+            index = self.starts[-1]
+        else:
+            index = self.cursor
+            self.starts.append(index)
+        self.talon.insert(index, card)
+        self.cursor += 1
+        card.location, card.container = 'deck', self
+        self.hash ^= WASTE_KEYS[card.number][self.cursor - 1]
+
+    def refresh(self):
+        for c in self.talon:
+            c.location = 'deck'
+        set_container(self.talon, self)
+
+    @staticmethod
+    def stock_key(card, slot):
+        key = STOCK_KEYS[card.number][slot]
+        return key ^ HIDDEN_KEYS[card.number] if card.hidden else key
+
+    def rehash(self):
+        # Zobrist hash of the stock and waste, kept up to date by `deal`, `draw`, `pop` and `push`
+        self.hash = 0
+        n = len(self.talon)
+        for i in range(self.cursor, n):
+            self.hash ^= self.stock_key(self.talon[i], n - 1 - i)
+        for i, slot in self.waste_slots():
+            self.hash ^= WASTE_KEYS[self.talon[i].number][slot]
+
+    def find(self, rank, suit):
+        # Face-up cards still in the stock or waste, which are the only ones left in the deck
+        c = self.lookup.get((rank, suit))
+        if c is not None and c.container is self and c.location == 'deck' and not c.hidden:
+            return c
+
+    def dump(self):
+        deck  = tuple(padded([c.dump() for c in self.iter_stock()], EMPTY, 24))
+        waste = tuple(padded([c.dump() for c in self.iter_waste()], EMPTY, 24))
+        return deck, waste
+
+class Foundation:
+
+    def __init__(self, suit, cards=()):
+        self.suit = suit
+        self.version = 0
+        self.cards = [Card(suit=suit, location='foundation')]
+        self.cards.extend(cards)
+        self.refresh()
+
+    def __repr__(self) -> str:
+        return str(self.cards)
+
+    def target(self) -> Card:
+        return self.cards[-1]
+
+    def sources(self) -> list:
+        return [self.cards[-1]]
+
+    def add(self, cards: list):
+        target = self.target()
+        children = target.allowable_children()
+
+        if cards[0] in children:
+            self.version += 1
+            self.cards.extend(cards)
+            self.refresh()
+        else:
+            raise ValueError(f"{cards[0]} not in {target.allowable_children()}")
+
+    def pop(self):
+        self.version += 1
+        c = self.cards.pop()
+        self.rehash()
+        return c
+
+    def split(self, card):
+        return [self.pop()]
+
+    def refresh(self):
+        for i, c in enumerate(self.cards):
+            c.hidden   = False
+            c.location = 'foundation'
+            c.position = i
+        set_container(self.cards, self)
+        self.rehash()
+
+    def rehash(self):
+        # Only the top card matters, the rest of a foundation follows from it
+        self.hash = FOUNDATION_KEYS[self.cards[-1].number]
+
+    def find(self, rank, suit):
+        # Foundations hold their suit in rank order on top of the suit card
+        if suit == self.suit and (rank in RANKS or rank is None):
+            index = RANKS.index(rank) + 1 if rank else 0
+            if index < len(self.cards):
+                return self.cards[index]
+
+    def dump(self):
+        return self.suit, self.target().dump()
+
+class Tableau:
+
+    def __init__(self, cards=()):
+        self.version = 0
+        self.hash = 0
+        self.cards = [Card(location='tableau')]
+        self.cards.extend(cards)
+        # Cards on this tableau by (rank, suit), see `find`
+        self.lookup = {}
+        self.refresh()
+        self.rehash()
+
+    def __repr__(self) -> str:
+        return str(self.cards)
+
+    def target(self) -> Card:
+        return self.cards[-1]
+
+    def sources(self):
+        cards = []
+
+        # Returns empty card if nothing is on top of it
+        if len(self.cards) == 1:
+            return [self.cards[0]]
+
+        for c in reversed(self.cards[1:]):
+            if not c.hidden:
+                cards.append(c)
+            else:
+                break
+
+        return list(reversed(cards))
+
+    def add(self, cards: list):
+        target = self.target()
+        children = target.allowable_children()
+
+        if cards[0] in children:
+            self.version += 1
+            for i, c in enumerate(cards, len(self.cards)):
+                self.hash ^= self.key(c, i)
+                c.location, c.container, c.position = 'tableau', self, i
+                self.lookup[c.rank, c.suit] = c
+            self.cards.extend(cards)
+            self.reveal()
+        else:
+            raise ValueError(f"{cards[0]} not in {target.allowable_children()}")
+
+    def pop(self):
+        self.version += 1
+        c = self.cards.pop()
+        self.hash ^= self.key(c, len(self.cards))
+        self.lookup.pop((c.rank, c.suit), None)
+        return c
+
+    def index(self, card):
+        # Constant time for cards placed by this tableau, a scan for equal cards that are not
+        index = card.position
+        if index is not None and index < len(self.cards) and self.cards[index] is card:
+            return index
+        return self.cards.index(card)
+
+    def split(self, card):
+        index = self.index(card)
+        if len(self.cards) > 1:
+            self.version += 1
+            split_cards = self.cards[index:]
+            for i, c in enumerate(split_cards, index):
+                self.hash ^= self.key(c, i)
+                self.lookup.pop((c.rank, c.suit), None)
+            del self.cards[index:]
+            self.reveal()
+            return split_cards
+        else:
+            return [self.cards.pop()]
+
+    def reveal(self):
+        if self.target().hidden is True:
+            self.target().hidden = False
+            self.hash ^= HIDDEN_KEYS[self.target().number]
+
+    def refresh(self):
+        for i, c in enumerate(self.cards):
+            c.location = 'tableau'
+            c.position = i
+        self.reveal()
+        set_container(self.cards, self)
+        self.lookup = {(c.rank, c.suit): c for c in self.cards}
+
+    @staticmethod
+    def key(card, slot):
+        key = TABLEAU_KEYS[card.number][slot]
+        return key ^ HIDDEN_KEYS[card.number] if card.hidden else key
+
+    def rehash(self):
+        # Zobrist hash of the cards above the empty card, kept up to date by `add`, `pop`, `split` and reveals
+        self.hash = 0
+        for i, c in enumerate(self.cards[1:], 1):
+            self.hash ^= self.key(c, i)
+
+    def find(self, rank, suit):
+        if rank and suit:
+            c = self.lookup.get((rank, suit))
+            if c is not None and not c.hidden:
+                return c
+        elif not rank and not suit:
+            c = self.cards[-1]
+            if not c.rank and not c.suit:
+                return c
+
+    def dump(self):
+        return tuple(padded([c.dump() for c in self.cards], EMPTY, 19))
+
+class Game:
+
+    def __new__(cls, seed=None, engine='object', deal=None):
+        # `Game(engine='array')` hands back the integer engine instead
+        if engine == 'array':
+            return ArrayGame(seed=seed, deal=deal)
+        elif engine in ENGINES:
+            return super().__new__(cls)
+        else:
+            raise ValueError(f'{engine} is not in {ENGINES}')
+
+    def __init__(self, seed=None, engine='object', deal=None):
+        self.deck = Deck(seed=seed)
+        if deal is None:
+            self.deck.shuffle()
+        else:
+            self.deck.arrange(self.deck.lookup[cards_mapping[n]] for n in validate_deal(deal))
+        self.score = 0
+        self.foundations = [Foundation(suit) for suit in SUITS]
+        self.tableaus = [Tableau(cards=self.deck.deal(i)) for i in range(1, 8)]
+        for t in self.tableaus: t.cards[-1].hidden = False
+
+        # Card objects by id, cards move between piles but are never replaced, see `locate`
+        self.numbers = [None] * (len(cards_mapping) + 1)
+        for c in self.deck.order:
+            self.numbers[c.number] = c
+        for f in self.foundations:
+            self.numbers[f.cards[0].number] = f.cards[0]
+
+        # Undo stack of moves, draws and rebuilds, see `undo`
+        self.history = []
+        self.deck.history = self.history
+
+        # Move generation cache, see `legal_moves`
+        self.piles    = self.tableaus + self.foundations + [self.deck]
+        self.versions = [None] * len(self.piles)
+        self.pile_targets = [None] * (len(self.piles) - 1)
+        self.pile_sources = [[] for p in self.piles]
+        self.pile_moves = [[[] for p in self.piles] for t in self.pile_targets]
+        self.moves    = []
+
+        # Observation buffer, allocated by the first `observation`, and action mask, see `action_mask`
+        self.buffer, self.views = None, None
+        self.observed = [None] * len(self.piles)
+        self.mask = None
+
+    def render(self, deck=True, waste=True, foundations=True, tableaus=True, targets=False, sources=False, legal_moves=True):
+        print()
+
+        if deck:
+            print('DECK:', self.deck.stock_size(), 'cards')
+            print(self.deck)
+            print()
+
+        if waste:
+            print('WASTE:', self.deck.waste_size(), 'cards')
+            print(self.deck.waste)
+            print()
+
+        if foundations:
+            print('FOUNDATIONS')
+            print(self.foundations)
+            print()
+
+        if tableaus:
+            from pprint import pprint
+            print('TABLEAUS')
+            pprint(self.tableaus)
+            print()
+
+        if targets:
+            print('TARGETS')
+            print(self.targets())
+            print()
+
+        if sources:
+            print('SOURCES')
+            print(self.sources())
+            print()
+
+        if legal_moves:
+            print('LEGAL MOVES')
+            print(self.legal_moves())
+            print()
+
+    def targets(self):
+        target_cards = []
+        for attribute in (self.tableaus, self.foundations):
+            for pile in attribute:
+                target_cards.append(pile.target())
+        return target_cards
+
+    def sources(self):
+        source_cards = []
+        for attribute in (self.tableaus, self.foundations):
+            for pile in attribute:
+                source_cards.extend(pile.sources())
+
+        try:
+            source_cards.extend(self.deck.sources())
+        except IndexError:
+            pass
+
+        return source_cards
+
+    def legal_moves(self):
+        """
+        Returns
+        -------
+        list:
+            `(target, source)` card pairs, ordered by target and then by source like `targets()` and `sources()`
+
+        Notes
+        -----
+        Moves are cached per (target pile, source pile) and only the cells of piles whose `version` changed since
+        the last call are regenerated. The returned list is shared between calls and must not be modified.
+        """
+        changed = [i for i, p in enumerate(self.piles) if p.version != self.versions[i]]
+        if not changed:
+            return self.moves
+
+        for i in changed:
+            pile = self.piles[i]
+            self.versions[i] = pile.version
+            try:
+                self.pile_sources[i] = [(c, (c.rank, c.suit)) for c in pile.sources()]
+            except IndexError:
+                self.pile_sources[i] = []
+            if pile is not self.deck:
+                target = pile.target()
+                self.pile_targets[i] = target, {(c.rank, c.suit) for c in target.allowable_children()}
+
+        for t, (target, children) in enumerate(self.pile_targets):
+            to_foundation = target.location == 'foundation'
+            for s, sources in enumerate(self.pile_sources):
+                if t in changed or s in changed:
+                    moves = self.pile_moves[t][s] = []
+                    for source, key in sources:
+                        if key in children:
+                            # Only the top card of a tableau can go to a foundation
+                            if to_foundation and s < len(self.tableaus) and source is not sources[-1][0]:
+                                continue
+                            moves.append((target, source))
+
+        self.moves = [m for row in self.pile_moves for cell in row for m in cell]
+        return self.moves
+
+    def heights(self):
+        # Number of cards on each foundation
+        return [len(f.cards) - 1 for f in self.foundations]
+
+    def safe_move(self):
+        # First legal move of a card to its foundation that `is_safe`, or None
+        heights = self.heights()
+        for target, source in self.legal_moves():
+            if target.location == 'foundation' and is_safe(source.number, heights):
+                return target, source
+
+    def auto_play(self):
+        # See `auto_play`
+        return auto_play(self)
+
+    def action_mask(self):
+        """
+        Returns
+        -------
+        numpy.ndarray:
+            Boolean mask of the `utility.action_mapping` keys that can be played, see `ActionMask`. The array is
+            shared between calls and updated in place
+        """
+        if self.mask is None:
+            self.mask = ActionMask()
+        moves = self.legal_moves()
+        return self.mask.update(moves, lambda: [(t.number, s.number) for t, s in moves], self.can_draw(), bool(self.history))
+
+    def draw(self):
+        self.deck.draw()
+
+    def can_draw(self):
+        return bool(self.deck.talon)
+
+    @classmethod
+    def from_deal(cls, deal, engine='object'):
+        """
+        Parameters
+        ----------
+        deal : sequence
+            Card ids 1 to 52 in stock order before dealing, like `deal_order` or a row of `solitaire.corpus.Corpus`
+        engine : str, optional
+            One of `ENGINES`
+
+        Returns
+        -------
+        Game or ArrayGame:
+            The game dealt from `deal`, without shuffling
+        """
+        return cls(engine=engine, deal=deal)
+
+    def clone(self):
+        """
+        Returns
+        -------
+        Game:
+            Independent copy of the cards, piles and undo history, with its own move cache and observation buffer
+
+        Notes
+        -----
+        Cards and piles are copied attribute by attribute and the references between them are pointed at the copies
+        by card id, more than ten times faster than `copy.deepcopy`.
+        """
+        def copied(obj):
+            new = object.__new__(obj.__class__)
+            new.__dict__ = obj.__dict__.copy()
+            return new
+
+        numbers = [None if c is None else copied(c) for c in self.numbers]
+        game = Game.__new__(Game)
+        game.piles = [copied(p) for p in self.piles]
+        game.tableaus, game.foundations, game.deck = game.piles[:7], game.piles[7:11], game.piles[11]
+        game.numbers = numbers
+        for p in game.tableaus:
+            # The empty card under every tableau is its own, the only card without a unique id
+            p.cards = [copied(p.cards[0])] + [numbers[c.number] for c in p.cards[1:]]
+            p.lookup = {k: numbers[c.number] for k, c in p.lookup.items()}
+        for p in game.foundations:
+            p.cards = [numbers[c.number] for c in p.cards]
+        deck = game.deck
+        deck.talon = [numbers[c.number] for c in deck.talon]
+        deck.order = [numbers[c.number] for c in deck.order]
+        deck.lookup = {k: numbers[c.number] for k, c in deck.lookup.items()}
+        # `rng` stays shared, `shuffle` reseeds it before every use
+        deck.starts, deck.indices = list(deck.starts), list(deck.indices)
+        for p in game.piles:
+            for c in p.talon if p is deck else p.cards:
+                c.container = p
+
+        game.score = self.score
+        # Moves refer to their piles, draws and rebuilds only to positions
+        piles = {id(p): q for p, q in zip(self.piles, game.piles)}
+        game.history = deck.history = [
+            (e[0], piles[id(e[1])], piles[id(e[2])]) + e[3:] if e[0] == 'move' else e for e in self.history
+        ]
+
+        game.versions = [None] * len(game.piles)
+        game.pile_targets = [None] * (len(game.piles) - 1)
+        game.pile_sources = [[] for p in game.piles]
+        game.pile_moves = [[[] for p in game.piles] for t in game.pile_targets]
+        game.moves = []
+        game.buffer, game.views = None, None
+        game.observed = [None] * len(game.piles)
+        game.mask = None
+        return game
+
+    def move_cards(self, move):
+        target, source = move
+
+        try:
+            origin = source.container
+            # A tableau card is revealed when the card under the moved ones is hidden
+            revealed = isinstance(origin, Tableau) and origin.cards[origin.index(source) - 1].hidden
+            cards = origin.split(source)
+            target.container.add(cards)
+        except AttributeError:
+            origin = self.deck
+            if self.deck.top() == source:
+                cards = [self.deck.pop()]
+                target.container.add(cards)
+            else:
+                return
+        self.history.append(('move', origin, target.container, len(cards), revealed))
+
+        '''
+        self.score += reward
+        print()
+        print('REWARD')
+        print(reward)
+        print()
+        print('TOTAL SCORE')
+        print(self.score)
+        '''
+
+    def undo(self):
+        """
+        Reverts the last move, draw or rebuild
+
+        Returns
+        -------
+        bool:
+            False if there was nothing to undo
+        """
+        if not self.history:
+            return False
+
+        entry = self.history.pop()
+        if entry[0] != 'move':
+            self.deck.undo(entry)
+            return True
+
+        kind, origin, pile, count, revealed = entry
+        cards = pile.cards[-count:]
+        del pile.cards[-count:]
+        pile.version += 1
+        pile.refresh()
+        pile.rehash()
+
+        origin.version += 1
+        if origin is self.deck:
+            origin.push(cards[0])
+        else:
+            if revealed:
+                origin.target().hidden = True
+            origin.cards.extend(cards)
+            origin.refresh()
+        origin.rehash()
+        return True
+
+    def snapshot(self):
+        """
+        Returns
+        -------
+        tuple:
+            The cards of every pile, their hidden flags, `times_rebuilt` and the length of the undo history, for
+            `restore`
+
+        Notes
+        -----
+        The history is not copied, `restore` cuts it back to its length at the snapshot. A snapshot can be restored
+        as long as the game was not undone past it, undoing further raises a ValueError on `restore` or, if moves
+        were played again since, leaves the wrong entries in the history.
+        """
+        piles  = tuple(tuple(p.cards) for p in self.tableaus + self.foundations)
+        hidden = tuple(c.hidden for c in self.deck.order)
+        deck = tuple(self.deck.talon), self.deck.cursor, tuple(self.deck.starts)
+        return piles, deck, hidden, self.deck.times_rebuilt, len(self.history)
+
+    def restore(self, snapshot):
+        piles, (talon, cursor, starts), hidden, times_rebuilt, history = snapshot
+        if len(self.history) < history:
+            raise ValueError('The game was undone past the snapshot')
+        for p, pile_cards in zip(self.tableaus + self.foundations, piles):
+            p.cards = list(pile_cards)
+            p.version += 1
+        for c, h in zip(self.deck.order, hidden):
+            c.hidden = h
+        for p in self.tableaus + self.foundations:
+            p.refresh()
+
+        self.deck.talon, self.deck.cursor, self.deck.starts = list(talon), cursor, list(starts)
+        self.deck.times_rebuilt = times_rebuilt
+        self.deck.version += 1
+        self.deck.refresh()
+        del self.history[history:]
+        for p in self.piles:
+            p.rehash()
+
+    def hash(self, canonical=False):
+        """
+        Parameters
+        ----------
+        canonical : bool, optional
+            Ignore the order of the tableaus and of their empty columns
+
+        Returns
+        -------
+        int:
+            64 bit Zobrist hash of the position, equal to `ArrayGame.hash` for the same position
+
+        Notes
+        -----
+        Every pile keeps its own hash up to date as cards are moved, drawn, rebuilt and revealed, so this only
+        combines twelve numbers. Face-down cards hash differently from face-up ones, `times_rebuilt` and the
+        undo history are not hashed.
+        """
+        others = [f.hash for f in self.foundations]
+        others.append(self.deck.hash)
+        return combine_hashes([t.hash for t in self.tableaus], others, canonical)
+
+    def get_move_reward(self, move):
+        target, source = move
+        origin = source.location
+        score = CARD_SCORES[source.number]
+
+        # Moving cards to foundation (target card is in foundation)
+        reward = score if target.location == 'foundation' else 0.0
+        # 20 points for uncovering hidden cards in tableau, `Tableau.index` is constant time for placed cards
+        if origin == 'tableau':
+            container = source.container
+            if container.cards[container.index(source) - 1].hidden:
+                reward += 20.0
+        # Moving cards from foundation (takes away points you gained)
+        elif origin == 'foundation':
+            reward -= score
+        # 20 points for playing card from waste (source card is in waste)
+        else:
+            reward += 20.0
+        return reward
+
+    def move_features(self, moves=None):
+        """
+        Parameters
+        ----------
+        moves : list, optional
+            Moves of this game, the legal moves by default
+
+        Returns
+        -------
+        tuple:
+            Lists of the source card ids, whether each move goes to a foundation, its origin, `FROM_TABLEAU`,
+            `FROM_FOUNDATION` or `FROM_WASTE`, and whether it uncovers a hidden card, the arguments of `move_rewards`
+        """
+        sources, to_foundation, origins, revealed = [], [], [], []
+        for target, source in self.legal_moves() if moves is None else moves:
+            origin = ORIGINS[source.location]
+            sources.append(source.number)
+            to_foundation.append(target.location == 'foundation')
+            origins.append(origin)
+            if origin == FROM_TABLEAU:
+                container = source.container
+                revealed.append(container.cards[container.index(source) - 1].hidden)
+            else:
+                revealed.append(False)
+        return sources, to_foundation, origins, revealed
+
+    def score_moves(self, moves=None):
+        """
+        Returns
+        -------
+        numpy.ndarray:
+            `get_move_reward` of every move, the legal moves by default, in one lookup of the reward tables
+        """
+        return move_rewards(*self.move_features(moves))
+
+    def get_draw_reward(self):
+        # -20 points for going through deck more than 3? times (Deck)
+        max_rebuilds = 3
+        if self.deck.cursor == len(self.deck.talon):
+            if self.deck.times_rebuilt >= max_rebuilds:
+                return -20.0
+            else:
+                return 0.0
+        else:
+            return 0.0
+
+    def find_card(self, rank, suit):
+        return self.find_number(NUMBERS.get((rank or None, suit or None)))
+
+    def find_number(self, number):
+        """
+        Parameters
+        ----------
+        number : int
+            Card id from `utility.get_number`
+
+        Returns
+        -------
+        Card:
+            The face-up card with that id wherever it is, the empty card of the first empty tableau for 57, or
+            None
+        """
+        if number == EMPTY_TABLEAU:
+            for t in self.tableaus:
+                if len(t.cards) == 1:
+                    return t.cards[0]
+        elif number is not None and 0 < number < len(self.numbers):
+            card = self.numbers[number]
+            if not card.hidden:
+                return card
+
+    def locate(self, number):
+        """
+        Parameters
+        ----------
+        number : int
+            Card id from `utility.get_number`, but not 57 which every tableau has
+
+        Returns
+        -------
+        tuple:
+            The `Tableau`, `Foundation` or `Deck` holding the card and its index in the pile's `cards`, which is
+            None in the stock and waste
+        """
+        card = self.numbers[number]
+        pile = card.container
+        return pile, (None if pile is self.deck else card.position)
+
+    def state(self):
+        tableau_names = '1st', '2nd', '3rd', '4th', '5th', '6th', '7th'
+
+        states      = OrderedDict()
+        deck, waste = self.deck.dump()
+        foundations = OrderedDict([f.dump() for f in self.foundations])
+        tableaus    = OrderedDict([(name, t.dump()) for name, t in zip(tableau_names, self.tableaus)])
+        legal_moves = tuple(padded([(k.dump(), v.dump()) for (k,v) in self.legal_moves()], (0, 0), 8))
+
+        states['Deck']        = deck
+        states['Foundations'] = foundations
+        states['Legal Moves'] = legal_moves
+        states['Tableaus']    = tableaus
+        states['Waste']       = waste
+
+        return states
+
+    def observation(self):
+        """
+        Returns
+        -------
+        OrderedDict:
+            What `state()` holds, as named `uint8` views into `self.buffer` laid out as `OBSERVATION_SHAPES`
+
+        Notes
+        -----
+        Only piles whose `version` changed since the last call are rewritten. The views are updated in place by
+        later calls, copy them to keep an observation around.
+        """
+        if self.views is None:
+            self.buffer, self.views = observation_buffer()
+        changed = [i for i, p in enumerate(self.piles) if p.version != self.observed[i]]
+        if not changed:
+            return self.views
+
+        views = self.views
+        for i in changed:
+            pile = self.piles[i]
+            self.observed[i] = pile.version
+            if i < len(self.tableaus):
+                write_row(views['Tableaus'][i], [c.dump() for c in pile.cards])
+            elif pile is self.deck:
+                write_row(views['Deck'], [c.dump() for c in pile.iter_stock()])
+                write_row(views['Waste'], [c.dump() for c in pile.iter_waste()])
+            else:
+                views['Foundations'][i - len(self.tableaus)] = pile.target().dump()
+
+        write_row(views['Legal Moves'], [(k.dump(), v.dump()) for (k, v) in self.legal_moves()[:len(views['Legal Moves'])]])
+        return views
+
+
+def _children_table(location):
+    # Card ids that `allowable_children` accepts on each card id in the given location
+    table = [frozenset()] * (EMPTY_TABLEAU + 1)
+    for number in range(1, EMPTY_TABLEAU + 1):
+        card = Card(*get_card(number), location=location)
+        if card.location == location:
+            table[number] = frozenset(c.dump() for c in card.allowable_children())
+    return tuple(table)
+
+def _parent_table():
+    # Card id left on top of a foundation once the given card id is taken off it
+    table = [EMPTY] * (EMPTY_TABLEAU + 1)
+    for number in range(1, 53):
+        rank, suit = get_card(number)
+        if rank == 'A':
+            table[number] = get_number(None, suit)
+        else:
+            table[number] = get_number(RANKS[RANKS.index(rank) - 1], suit)
+    return tuple(table)
+
+CARD = HIDDEN - 1
+EMPTY_TABLEAU = get_number(None, None)
+FOUNDATION_BASES = tuple(get_number(None, suit) for suit in SUITS)
+STOCK, WASTE = 11, 12
+TABLEAU_CHILDREN = _children_table('tableau')
+FOUNDATION_CHILDREN = _children_table('foundation')
+FOUNDATION_PARENTS = _parent_table()
+CARD_SCORES = tuple(FOUNDATION_SCORES.get(get_card(n)[0], 0.0) if n else 0.0 for n in range(EMPTY_TABLEAU + 1))
+# Where a move comes from for `move_rewards`, by `Card.location`
+FROM_TABLEAU, FROM_FOUNDATION, FROM_WASTE = 0, 1, 2
+ORIGINS = {'tableau': FROM_TABLEAU, 'foundation': FROM_FOUNDATION, 'deck': FROM_WASTE}
+
+def _reward_table():
+    # `get_move_reward` by source card id, whether the move goes to a foundation, origin and whether a hidden card
+    # is uncovered, flattened in that order
+    table = []
+    for score in CARD_SCORES:
+        for to_foundation in (0, 1):
+            for origin in (FROM_TABLEAU, FROM_FOUNDATION, FROM_WASTE):
+                for revealed in (0, 1):
+                    reward = score * to_foundation - score * (origin == FROM_FOUNDATION)
+                    table.append(reward + 20.0 * (origin == FROM_WASTE or origin == FROM_TABLEAU and revealed))
+    return tuple(table)
+
+MOVE_REWARDS = _reward_table()
+# `MOVE_REWARDS` as an array, made by the first `move_rewards`
+REWARD_ARRAY = None
+
+def move_rewards(sources, to_foundation, origins, revealed):
+    """
+    Parameters
+    ----------
+    sources : array_like
+        Card ids of the cards moved
+    to_foundation : array_like
+        Whether each move goes to a foundation
+    origins : array_like
+        `FROM_TABLEAU`, `FROM_FOUNDATION` or `FROM_WASTE`
+    revealed : array_like
+        Whether each move uncovers a hidden tableau card
+
+    Returns
+    -------
+    numpy.ndarray:
+        `get_move_reward` of every move, from any number of games at once, in one lookup of `MOVE_REWARDS`. See
+        `Game.move_features`
+    """
+    global REWARD_ARRAY
+    import numpy as np
+    if REWARD_ARRAY is None:
+        REWARD_ARRAY = np.array(MOVE_REWARDS)
+    index = np.asarray(sources, np.intp) * 2 + np.asarray(to_foundation, np.intp)
+    index = (index * 3 + np.asarray(origins, np.intp)) * 2 + np.asarray(revealed, np.intp)
+    return REWARD_ARRAY[index]
+
+# Foundations of the other colour, by foundation, which is by suit in `SUITS` order
+OPPOSITE_FOUNDATIONS = tuple(tuple(SUITS.index(o) for o in get_opposite_suits(s)) for s in SUITS)
+
+def is_safe(number, heights):
+    """
+    Parameters
+    ----------
+    number : int
+        Card id, 1 to 52
+    heights : sequence
+        Number of cards on each foundation, in `SUITS` order
+
+    Returns
+    -------
+    bool:
+        Whether putting the card on its foundation can never cost a win. Aces and twos are never needed on a
+        tableau, and neither is a card once both foundations of the other colour hold the rank below it, since
+        every card that could be placed on it is already gone.
+    """
+    suit, rank = divmod(number - 1, 13)
+    return rank < 2 or all(heights[f] >= rank for f in OPPOSITE_FOUNDATIONS[suit])
+
+def auto_play(game):
+    """
+    Plays the moves of `game.safe_move` until there are none left
+
+    Returns
+    -------
+    tuple:
+        The sum of `get_move_reward` over the moves played and the moves, in order
+    """
+    reward, moves = 0.0, []
+    move = game.safe_move()
+    while move is not None:
+        reward += game.get_move_reward(move)
+        game.move_cards(move)
+        moves.append(move)
+        move = game.safe_move()
+    return reward, moves
+
+class ArrayGame:
+    """
+    Integer engine with the same `legal_moves`/`move_cards`/`state` surface as `Game`
+
+    Notes
+    -----
+    Piles are bytearrays of the 1-57 card ids from `utility.cards_mapping`, with `HIDDEN` set on face-down
+    slots, and `where` maps every card id to its pile: tableaus are 0-6, foundations 7-10, then `STOCK` and
+    `WASTE`. Moves are `(target, source)` card id pairs, as dumped by `Game.state`. An empty tableau target
+    (57) resolves to the first empty tableau, the same one `Game.find_card(None, None)` returns.
+    """
+
+    def __init__(self, seed=None, deal=None):
+        order = deal_order(seed) if deal is None else validate_deal(deal)
+
+        self.seed = seed
+        self.score = 0
+        self.times_rebuilt = 0
+        self.position = bytearray(EMPTY_TABLEAU + 1)
+        self.where = bytearray(EMPTY_TABLEAU + 1)
+        for i, number in enumerate(order):
+            self.position[number] = i
+
+        self.tableaus = []
+        for i in range(7):
+            start = i * (i + 1) // 2
+            pile = bytearray(c | HIDDEN for c in order[start:start + i + 1])
+            pile[-1] &= CARD
+            self.tableaus.append(pile)
+        self.foundations = bytearray(FOUNDATION_BASES)
+        self.stock = bytearray(c | HIDDEN for c in order[28:])
+        self.waste = bytearray()
+
+        for i, pile in enumerate(self.tableaus):
+            for c in pile:
+                self.where[c & CARD] = i
+        for i, number in enumerate(FOUNDATION_BASES, 7):
+            self.where[number] = i
+        for c in self.stock:
+            self.where[c & CARD] = STOCK
+
+        # Undo stack of moves, draws and rebuilds, see `undo`
+        self.history = []
+
+        # Pile versions, observation buffer, allocated by the first `observation`, `action_mask` and the
+        # `legal_moves` of the versions in `moves_key`
+        self.versions = [0] * (WASTE + 1)
+        self.buffer, self.views = None, None
+        self.observed = [None] * (WASTE + 1)
+        self.mask = None
+        self.moves, self.moves_key = None, None
+
+        # Zobrist hash of every pile, see `hash`
+        self.hashes = [0] * (WASTE + 1)
+        for i in range(WASTE + 1):
+            self._rehash(i)
+
+    def render(self, deck=True, waste=True, foundations=True, tableaus=True, targets=False, sources=False, legal_moves=True):
+        print()
+
+        if deck:
+            print('DECK:', len(self.stock), 'cards')
+            print(self._cards(self.stock))
+            print()
+
+        if waste:
+            print('WASTE:', len(self.waste), 'cards')
+            print(self._cards(self.waste))
+            print()
+
+        if foundations:
+            print('FOUNDATIONS')
+            print([self._cards(bytes((c,))) for c in self.foundations])
+            print()
+
+        if tableaus:
+            from pprint import pprint
+            print('TABLEAUS')
+            pprint([self._cards(bytes((EMPTY_TABLEAU,)) + t) for t in self.tableaus])
+            print()
+
+        if targets:
+            print('TARGETS')
+            print(self._cards(bytes(self.targets())))
+            print()
+
+        if sources:
+            print('SOURCES')
+            print(self._cards(bytes(self.sources())))
+            print()
+
+        if legal_moves:
+            print('LEGAL MOVES')
+            print([tuple(self._cards(bytes(m))) for m in self.legal_moves()])
+            print()
+
+    @staticmethod
+    def _cards(pile):
+        return [Card(*get_card(c & CARD), hidden=bool(c & HIDDEN)) for c in pile]
+
+    @staticmethod
+    def _run(pile):
+        # Face-up cards on top of a tableau, hidden cards are always underneath them
+        for i, c in enumerate(pile):
+            if not c & HIDDEN:
+                return pile[i:]
+        return pile
+
+    @staticmethod
+    def _key(keys, c, slot):
+        key = keys[c & CARD][slot]
+        return key ^ HIDDEN_KEYS[c & CARD] if c & HIDDEN else key
+
+    def _rehash(self, pile):
+        # Same keys as the piles of `Game`, tableau slot 0 being the empty card
+        h = 0
+        if pile < 7:
+            for i, c in enumerate(self.tableaus[pile], 1):
+                h ^= self._key(TABLEAU_KEYS, c, i)
+        elif pile < STOCK:
+            h = FOUNDATION_KEYS[self.foundations[pile - 7]]
+        else:
+            cards, keys = (self.stock, STOCK_KEYS) if pile == STOCK else (self.waste, WASTE_KEYS)
+            for i, c in enumerate(reversed(cards)):
+                h ^= self._key(keys, c, i)
+        self.hashes[pile] = h
+
+    def hash(self, canonical=False):
+        """
+        Parameters
+        ----------
+        canonical : bool, optional
+            Ignore the order of the tableaus and of their empty columns
+
+        Returns
+        -------
+        int:
+            64 bit Zobrist hash of the position, see `Game.hash`
+        """
+        return combine_hashes(self.hashes[:7], self.hashes[7:], canonical)
+
+    def targets(self):
+        target_cards = [t[-1] if t else EMPTY_TABLEAU for t in self.tableaus]
+        target_cards.extend(self.foundations)
+        return target_cards
+
+    def sources(self):
+        source_cards = []
+        for t in self.tableaus:
+            source_cards.extend(self._run(t) if t else (EMPTY_TABLEAU,))
+        source_cards.extend(self.foundations)
+        source_cards.extend(self.waste[:1])
+        return source_cards
+
+    def legal_moves(self):
+        # Generated again only when a pile's version changed, the list is shared like `Game.legal_moves`
+        key = tuple(self.versions)
+        if key == self.moves_key:
+            return self.moves
+        moves = []
+        sources = self.sources()
+        # Only the top card of a tableau can go to a foundation
+        tops = [t[-1] for t in self.tableaus if t] + list(self.foundations) + list(self.waste[:1])
+        for i, target in enumerate(self.targets()):
+            if i < 7:
+                children, candidates = TABLEAU_CHILDREN[target], sources
+            else:
+                children, candidates = FOUNDATION_CHILDREN[target], tops
+            for source in candidates:
+                if source in children:
+                    moves.append((target, source))
+        self.moves, self.moves_key = moves, key
+        return moves
+
+    def heights(self):
+        return [0 if top in FOUNDATION_BASES else (top - 1) % 13 + 1 for top in self.foundations]
+
+    def safe_move(self):
+        # See `Game.safe_move`
+        heights = self.heights()
+        for target, source in self.legal_moves():
+            if target != EMPTY_TABLEAU and 7 <= self.where[target] < STOCK and is_safe(source, heights):
+                return target, source
+
+    def auto_play(self):
+        return auto_play(self)
+
+    def action_mask(self):
+        # See `Game.action_mask`
+        if self.mask is None:
+            self.mask = ActionMask()
+        return self.mask.update(tuple(self.versions), self.legal_moves, self.can_draw(), bool(self.history))
+
+    def draw(self):
+        if self.stock:
+            drawn = self.stock[:3]
+            for i, c in enumerate(drawn, 1):
+                self.hashes[STOCK] ^= self._key(STOCK_KEYS, c, len(self.stock) - i)
+            del self.stock[:3]
+            self.history.append(('draw', bytes(drawn)))
+            for i, c in enumerate(drawn):
+                drawn[i] = c & CARD
+                self.where[c & CARD] = WASTE
+            self.waste[:0] = drawn
+            for i, c in enumerate(drawn, 1):
+                self.hashes[WASTE] ^= WASTE_KEYS[c][len(self.waste) - i]
+            self.versions[STOCK] += 1
+            self.versions[WASTE] += 1
+        else:
+            self.rebuild()
+
+    def can_draw(self):
+        return bool(self.stock or self.waste)
+
+    @classmethod
+    def from_deal(cls, deal):
+        # See `Game.from_deal`
+        return cls(deal=deal)
+
+    @classmethod
+    def from_game(cls, game):
+        """
+        Parameters
+        ----------
+        game : Game
+
+        Returns
+        -------
+        ArrayGame:
+            The same deal in the position `game` is in, without its undo history
+        """
+        array = cls(seed=game.deck.seed, deal=[c.number for c in game.deck.order])
+        flagged = lambda cards: bytes(c.number | HIDDEN if c.hidden else c.number for c in cards)
+        piles = tuple(flagged(t.cards[1:]) for t in game.tableaus)
+        where = bytearray(array.where)
+        for i, pile in enumerate(game.tableaus + game.foundations):
+            for c in pile.cards:
+                if c.number != EMPTY_TABLEAU:
+                    where[c.number] = i
+        deck = game.deck
+        for i in range(len(deck.talon)):
+            where[deck.talon[i].number] = WASTE if i < deck.cursor else STOCK
+        foundations = bytes(f.cards[-1].number for f in game.foundations)
+        waste = bytes(c.number for c in deck.iter_waste())
+        array.restore((piles, foundations, flagged(deck.iter_stock()), waste, bytes(where), deck.times_rebuilt, 0))
+        return array
+
+    def clone(self):
+        """
+        Returns
+        -------
+        ArrayGame:
+            Independent copy of the piles, undo history and hashes, with its own observation buffer
+        """
+        game = ArrayGame.__new__(ArrayGame)
+        game.seed, game.score, game.times_rebuilt = self.seed, self.score, self.times_rebuilt
+        game.position, game.where = self.position, bytearray(self.where)
+        game.tableaus = [bytearray(t) for t in self.tableaus]
+        game.foundations, game.stock, game.waste = bytearray(self.foundations), bytearray(self.stock), bytearray(self.waste)
+        game.history = list(self.history)
+        game.versions = [0] * (WASTE + 1)
+        game.buffer, game.views = None, None
+        game.observed = [None] * (WASTE + 1)
+        game.mask = None
+        game.moves, game.moves_key = None, None
+        game.hashes = list(self.hashes)
+        return game
+
+    def rebuild(self):
+        self.history.append(('rebuild', bytes(self.stock), bytes(self.waste)))
+        self.stock.extend(self.waste)
+        self.stock = bytearray(sorted(self.stock, key=lambda c: self.position[c & CARD]))
+        self.waste = bytearray()
+        for c in self.stock:
+            self.where[c & CARD] = STOCK
+        self.times_rebuilt += 1
+        self.versions[STOCK] += 1
+        self.versions[WASTE] += 1
+        self._rehash(STOCK)
+        self._rehash(WASTE)
+
+    def find_pile(self, target):
+        if target == EMPTY_TABLEAU:
+            for i, t in enumerate(self.tableaus):
+                if not t:
+                    return i
+        else:
+            pile = self.where[target]
+            if pile < 7:
+                t = self.tableaus[pile]
+                if t and t[-1] == target:
+                    return pile
+            elif pile < STOCK and self.foundations[pile - 7] == target:
+                return pile
+
+    def move_cards(self, move):
+        target, source = move
+        pile = self.find_pile(target)
+        if pile is None:
+            raise ValueError(f'{target} is not a target')
+
+        children = TABLEAU_CHILDREN[target] if pile < 7 else FOUNDATION_CHILDREN[target]
+        if source not in children:
+            raise ValueError(f'{source} not in {sorted(children)}')
+
+        origin, revealed = self.where[source], False
+        hashes = self.hashes
+        if origin < 7:
+            t = self.tableaus[origin]
+            if source not in t:
+                raise ValueError(f'{source} is hidden')
+            index = t.index(source)
+            if pile >= 7 and index != len(t) - 1:
+                raise ValueError(f'{source} is not on top of its tableau')
+            cards = t[index:]
+            for i, c in enumerate(cards, index + 1):
+                hashes[origin] ^= TABLEAU_KEYS[c][i]
+            del t[index:]
+            revealed = bool(t) and bool(t[-1] & HIDDEN)
+            if revealed:
+                t[-1] &= CARD
+                hashes[origin] ^= HIDDEN_KEYS[t[-1]]
+        elif origin < STOCK:
+            if self.foundations[origin - 7] != source:
+                raise ValueError(f'{source} is not on top of its foundation')
+            cards = bytearray((source,))
+            self.foundations[origin - 7] = FOUNDATION_PARENTS[source]
+            hashes[origin] = FOUNDATION_KEYS[FOUNDATION_PARENTS[source]]
+        elif origin == WASTE and self.waste[0] == source:
+            cards = bytearray((source,))
+            del self.waste[0]
+            hashes[WASTE] ^= WASTE_KEYS[source][len(self.waste)]
+        else:
+            raise ValueError(f'{source} is not a source')
+
+        if pile < 7:
+            t = self.tableaus[pile]
+            for i, c in enumerate(cards, len(t) + 1):
+                hashes[pile] ^= TABLEAU_KEYS[c][i]
+            t.extend(cards)
+        else:
+            self.foundations[pile - 7] = source
+            hashes[pile] = FOUNDATION_KEYS[source]
+        for c in cards:
+            self.where[c] = pile
+        self.versions[origin] += 1
+        self.versions[pile] += 1
+        self.history.append(('move', origin, pile, len(cards), revealed))
+
+    def undo(self):
+        """
+        Reverts the last move, draw or rebuild
+
+        Returns
+        -------
+        bool:
+            False if there was nothing to undo
+        """
+        if not self.history:
+            return False
+
+        entry = self.history.pop()
+        if entry[0] == 'draw':
+            drawn = entry[1]
+            del self.waste[:len(drawn)]
+            self.stock[:0] = drawn
+            for c in drawn:
+                self.where[c & CARD] = STOCK
+            self.versions[STOCK] += 1
+            self.versions[WASTE] += 1
+            self._rehash(STOCK)
+            self._rehash(WASTE)
+        elif entry[0] == 'rebuild':
+            self.stock, self.waste = bytearray(entry[1]), bytearray(entry[2])
+            for c in self.waste:
+                self.where[c] = WASTE
+            self.times_rebuilt -= 1
+            self.versions[STOCK] += 1
+            self.versions[WASTE] += 1
+            self._rehash(STOCK)
+            self._rehash(WASTE)
+        else:
+            kind, origin, pile, count, revealed = entry
+            if pile < 7:
+                cards = self.tableaus[pile][-count:]
+                del self.tableaus[pile][-count:]
+            else:
+                cards = bytearray(self.foundations[pile - 7:pile - 6])
+                self.foundations[pile - 7] = FOUNDATION_PARENTS[cards[0]]
+
+            if origin < 7:
+                t = self.tableaus[origin]
+                if revealed:
+                    t[-1] |= HIDDEN
+                t.extend(cards)
+            elif origin < STOCK:
+                self.foundations[origin - 7] = cards[0]
+            else:
+                self.waste[:0] = cards
+            for c in cards:
+                self.where[c] = origin
+            self.versions[origin] += 1
+            self.versions[pile] += 1
+            self._rehash(origin)
+            self._rehash(pile)
+        return True
+
+    def snapshot(self):
+        """
+        Returns
+        -------
+        tuple:
+            Byte copies of every pile and of `where`, `times_rebuilt` and the length of the undo history, for
+            `restore`, see `Game.snapshot`
+        """
+        piles = tuple(bytes(t) for t in self.tableaus)
+        return piles, bytes(self.foundations), bytes(self.stock), bytes(self.waste), bytes(self.where), self.times_rebuilt, len(self.history)
+
+    def restore(self, snapshot):
+        piles, foundations, stock, waste, where, times_rebuilt, history = snapshot
+        if len(self.history) < history:
+            raise ValueError('The game was undone past the snapshot')
+        self.times_rebuilt = times_rebuilt
+        self.tableaus = [bytearray(t) for t in piles]
+        self.foundations = bytearray(foundations)
+        self.stock, self.waste, self.where = bytearray(stock), bytearray(waste), bytearray(where)
+        del self.history[history:]
+        self.versions = [v + 1 for v in self.versions]
+        for i in range(WASTE + 1):
+            self._rehash(i)
+
+    def get_move_reward(self, move):
+        target, source = move
+        where, score = self.where, CARD_SCORES[source]
+
+        # Moving cards to foundation (target card is in foundation)
+        reward = score if target != EMPTY_TABLEAU and 7 <= where[target] < STOCK else 0.0
+        origin = where[source]
+        # 20 points for uncovering hidden cards in tableau (source card is in tableau)
+        if origin < 7:
+            t = self.tableaus[origin]
+            index = t.index(source)
+            if index and t[index - 1] & HIDDEN:
+                reward += 20.0
+        # Moving cards from foundation (takes away points you gained)
+        elif origin < STOCK:
+            reward -= score
+        # 20 points for playing card from waste (source card is in waste)
+        else:
+            reward += 20.0
+        return reward
+
+    def move_features(self, moves=None):
+        # See `Game.move_features`
+        where, tableaus = self.where, self.tableaus
+        sources, to_foundation, origins, revealed = [], [], [], []
+        for target, source in self.legal_moves() if moves is None else moves:
+            pile = where[source]
+            sources.append(source)
+            to_foundation.append(target != EMPTY_TABLEAU and 7 <= where[target] < STOCK)
+            if pile < 7:
+                t = tableaus[pile]
+                index = t.index(source)
+                origins.append(FROM_TABLEAU)
+                revealed.append(index > 0 and t[index - 1] & HIDDEN > 0)
+            else:
+                origins.append(FROM_FOUNDATION if pile < STOCK else FROM_WASTE)
+                revealed.append(False)
+        return sources, to_foundation, origins, revealed
+
+    def score_moves(self, moves=None):
+        # See `Game.score_moves`
+        return move_rewards(*self.move_features(moves))
+
+    def get_draw_reward(self):
+        # -20 points for going through deck more than 3? times (Deck)
+        max_rebuilds = 3
+        if len(self.stock) == 0 and self.times_rebuilt >= max_rebuilds:
+            return -20.0
+        else:
+            return 0.0
+
+    def find_card(self, rank, suit):
+        return self.find_number(get_number(rank, suit))
+
+    def find_number(self, number):
+        if number == EMPTY_TABLEAU:
+            return number if self.find_pile(number) is not None else None
+
+        pile = self.where[number]
+        if number in FOUNDATION_BASES:
+            return number
+        elif pile < 7:
+            return number if number in self.tableaus[pile] else None
+        elif pile < STOCK:
+            return number
+        elif pile == STOCK:
+            return number if number in self.stock else None
+        else:
+            return number
+
+    def state(self):
+        tableau_names = '1st', '2nd', '3rd', '4th', '5th', '6th', '7th'
+
+        def dump(pile):
+            return [HIDDEN_CARD if c & HIDDEN else c for c in pile]
+
+        states      = OrderedDict()
+        deck, waste = tuple(padded(dump(self.stock), EMPTY, 24)), tuple(padded(dump(self.waste), EMPTY, 24))
+        foundations = OrderedDict(zip(SUITS, self.foundations))
+        tableaus    = OrderedDict([(name, tuple(padded([EMPTY_TABLEAU] + dump(t), EMPTY, 19))) for name, t in zip(tableau_names, self.tableaus)])
+        legal_moves = tuple(padded(self.legal_moves(), (0, 0), 8))
+
+        states['Deck']        = deck
+        states['Foundations'] = foundations
+        states['Legal Moves'] = legal_moves
+        states['Tableaus']    = tableaus
+        states['Waste']       = waste
+
+        return states
+
+    def observation(self):
+        """
+        Returns
+        -------
+        OrderedDict:
+            What `state()` holds, as named `uint8` views into `self.buffer` laid out as `OBSERVATION_SHAPES`
+
+        Notes
+        -----
+        Only piles whose version changed since the last call are rewritten. The views are updated in place by
+        later calls, copy them to keep an observation around.
+        """
+        if self.views is None:
+            self.buffer, self.views = observation_buffer()
+        changed = [i for i, v in enumerate(self.versions) if v != self.observed[i]]
+        if not changed:
+            return self.views
+
+        views = self.views
+        for i in changed:
+            self.observed[i] = self.versions[i]
+            if i < 7:
+                write_row(views['Tableaus'][i], [EMPTY_TABLEAU] + [HIDDEN_CARD if c & HIDDEN else c for c in self.tableaus[i]])
+            elif i < STOCK:
+                views['Foundations'][i - 7] = self.foundations[i - 7]
+            elif i == STOCK:
+                write_row(views['Deck'], [HIDDEN_CARD if c & HIDDEN else c for c in self.stock])
+            else:
+                write_row(views['Waste'], self.waste)
+
+        write_row(views['Legal Moves'], self.legal_moves()[:len(views['Legal Moves'])])
+        return views
+
+
+# Opt-in instrumentation, see `solitaire.profiling`
+if os.environ.get('SOLITAIRE_PROFILE'):
+    from solitaire import profiling
+    profiling.enable_from_environment()
@@ -0,0 +1,22 @@
+import random
+from solitaire import Game, print_observation
+
+
+if __name__ == '__main__':
+    game = Game(seed=1)
+
+    for x in range(50000):
+        print()
+        print(f'Round: {x}', '==' * 100)
+        #game.render()
+        possible_moves = game.legal_moves()
+        print('Number of Legal Moves:', len(possible_moves))
+        if len(possible_moves) > 5:
+            game.render()
+        try:
+            chosen_move = random.choice(possible_moves)
+            game.move_cards(chosen_move)
+        except IndexError:
+            game.deck.draw()
+
+        print_observation(game.state())
@@ -0,0 +1,195 @@
+import argparse, json, platform, random, sys, time
+from collections import OrderedDict
+from solitaire import Game, ENGINES
+
+
+SEEDS = tuple(range(10))
+ROUNDS = 500
+THRESHOLD = 0.25
+
+
+def draw(game):
+    # `Deck.draw` and `Deck.rebuild` on the object engine, their `ArrayGame` counterparts otherwise
+    if isinstance(game, Game):
+        if game.deck.stock_size():
+            game.deck.draw()
+            return 'draw'
+        game.deck.rebuild()
+        return 'rebuild'
+    if game.stock:
+        game.draw()
+        return 'draw'
+    game.rebuild()
+    return 'rebuild'
+
+
+def bench_deal(engine, seeds, rounds):
+    start = time.perf_counter()
+    for seed in seeds:
+        Game(seed=seed, engine=engine)
+    return {'deal': (len(seeds), time.perf_counter() - start)}
+
+
+def bench_paths(engine, seeds, rounds):
+    # Random play that draws a fifth of the time, timing every call on the way
+    totals = OrderedDict((name, [0, 0.0]) for name in ('legal_moves', 'move_cards', 'draw', 'rebuild', 'state'))
+    clock = time.perf_counter
+
+    def add(name, start):
+        total = totals[name]
+        total[0] += 1
+        total[1] += clock() - start
+
+    for seed in seeds:
+        game, rng = Game(seed=seed, engine=engine), random.Random(seed)
+        for x in range(rounds):
+            start = clock()
+            moves = game.legal_moves()
+            add('legal_moves', start)
+
+            if moves and rng.random() < 0.8:
+                move = rng.choice(moves)
+                start = clock()
+                game.move_cards(move)
+                add('move_cards', start)
+            else:
+                start = clock()
+                name = draw(game)
+                add(name, start)
+
+            start = clock()
+            game.state()
+            add('state', start)
+    return {name: tuple(total) for name, total in totals.items()}
+
+
+def bench_env(engine, seeds, rounds):
+    from gym_solitaire.envs.env import SolitaireEnv
+
+    steps, seconds = 0, 0.0
+    for seed in seeds:
+        env, rng = SolitaireEnv({'seed': seed, 'engine': engine}), random.Random(seed)
+        actions = [rng.randrange(1, 8) for x in range(rounds)]
+        start = time.perf_counter()
+        for action in actions:
+            env.step(action)
+        seconds += time.perf_counter() - start
+        steps += rounds
+    return {'env_step': (steps, seconds)}
+
+
+def bench_random_play(engine, seeds, rounds):
+    # The loop of `python -m solitaire` without the printing, a game being `rounds` rounds of it
+    start = time.perf_counter()
+    for seed in seeds:
+        game, rng = Game(seed=seed, engine=engine), random.Random(seed)
+        for x in range(rounds):
+            possible_moves = game.legal_moves()
+            try:
+                chosen_move = rng.choice(possible_moves)
+                game.move_cards(chosen_move)
+            except IndexError:
+                draw(game)
+            game.state()
+    return {'random_play': (len(seeds), time.perf_counter() - start)}
+
+
+BENCHMARKS = (bench_deal, bench_paths, bench_env, bench_random_play)
+
+
+def run(engines=ENGINES, seeds=SEEDS, rounds=ROUNDS, repeat=3):
+    """
+    Parameters
+    ----------
+    engines : tuple, optional
+        Engines from `ENGINES` to measure
+    seeds : tuple, optional
+        Deals every benchmark plays
+    rounds : int, optional
+        Actions per deal
+    repeat : int, optional
+        Runs of every benchmark, the fastest one is kept
+
+    Returns
+    -------
+    OrderedDict:
+        Machine details and, under 'results', the calls made and seconds per call of every '<engine>.<path>'
+        that was reached
+    """
+    results = OrderedDict()
+    for engine in engines:
+        for benchmark in BENCHMARKS:
+            runs = [benchmark(engine, seeds, rounds) for x in range(repeat)]
+            for name in runs[0]:
+                calls, seconds = min((r[name] for r in runs), key=lambda x: x[1] / max(x[0], 1))
+                # Paths a short run never reached, like a rebuild, are left out
+                if calls and seconds:
+                    results[f'{engine}.{name}'] = OrderedDict([
+                        ('calls', calls),
+                        ('seconds_per_call', seconds / calls),
+                        ('calls_per_second', calls / seconds)
+                    ])
+
+    report = OrderedDict()
+    report['python'] = platform.python_version()
+    report['machine'] = platform.machine()
+    report['seeds'] = list(seeds)
+    report['rounds'] = rounds
+    report['results'] = results
+    return report
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    Parameters
+    ----------
+    baseline, current : dict
+        Reports returned by `run`
+    threshold : float, optional
+        Allowed slow down, 0.25 fails paths that take more than 25% longer per call
+
+    Returns
+    -------
+    list:
+        `(name, baseline seconds, current seconds, ratio)` for every path present in both that regressed
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name, {}).get('seconds_per_call')
+        new = result['seconds_per_call']
+        if old and new and new / old > 1 + threshold:
+            regressions.append((name, old, new, new / old))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m solitaire.benchmark', description='Times the engine hot paths')
+    parser.add_argument('--engine', choices=ENGINES, action='append', help='engine to measure, all by default')
+    parser.add_argument('--seeds', type=int, default=len(SEEDS), help='number of deals, seeded 0 to n - 1')
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help='actions per deal')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the fastest is kept')
+    parser.add_argument('--output', help='JSON file to write the results to')
+    parser.add_argument('--compare', help='JSON file of earlier results to check against')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='allowed slow down per call')
+    args = parser.parse_args(argv)
+
+    report = run(tuple(args.engine or ENGINES), tuple(range(args.seeds)), args.rounds, args.repeat)
+    for name, result in report['results'].items():
+        print(f"{name:<24} {result['seconds_per_call'] * 1e6:>12.2f} us {result['calls_per_second']:>14.1f} /s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f'REGRESSION {name}: {old * 1e6:.2f} us -> {new * 1e6:.2f} us ({ratio:.2f}x)')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
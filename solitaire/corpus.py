@@ -0,0 +1,157 @@
+import struct
+import numpy as np
+from solitaire import Game, deal_order, deal_seed, validate_deal
+
+
+# File header: magic, number of deals, flags
+MAGIC = b'SOLDEAL1'
+HEADER = struct.Struct('<8sQI4x')
+LABELLED = 1
+
+UNKNOWN = -1
+DEAL_DTYPE = np.dtype([('order', np.uint8, 52)])
+LABELLED_DTYPE = np.dtype([('order', np.uint8, 52), ('solvable', np.int8), ('solution_length', np.int16)])
+
+
+class Writer:
+    """
+    Appends deals to a corpus file, see `Corpus`
+
+    Parameters
+    ----------
+    path : str
+    labelled : bool, optional
+        Store `solvable` and `solution_length` with every deal
+
+    Notes
+    -----
+    The header is rewritten with the number of deals on `close`, so a corpus that was not closed reads as empty.
+    """
+
+    def __init__(self, path, labelled=False):
+        self.labelled = labelled
+        self.dtype = LABELLED_DTYPE if labelled else DEAL_DTYPE
+        self.count = 0
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, 0, LABELLED if labelled else 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, deal, solvable=UNKNOWN, solution_length=UNKNOWN):
+        """
+        Parameters
+        ----------
+        deal : sequence
+            Card ids 1 to 52 in stock order before dealing, see `solitaire.deal_order`
+        solvable : int, optional
+            1 or 0 when known, only stored in labelled corpora
+        solution_length : int, optional
+            Actions in a known solution, only stored in labelled corpora
+        """
+        record = np.zeros(1, self.dtype)
+        record['order'] = validate_deal(deal)
+        if self.labelled:
+            record['solvable'], record['solution_length'] = solvable, solution_length
+        self.file.write(record.tobytes())
+        self.count += 1
+
+    def write_many(self, orders, solvable=UNKNOWN, solution_length=UNKNOWN):
+        # Unchecked bulk write of an (n, 52) array of deals, labels broadcast over them
+        orders = np.asarray(orders, np.uint8).reshape(-1, 52)
+        records = np.zeros(len(orders), self.dtype)
+        records['order'] = orders
+        if self.labelled:
+            records['solvable'], records['solution_length'] = solvable, solution_length
+        self.file.write(records.tobytes())
+        self.count += len(records)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.count, LABELLED if self.labelled else 0))
+        self.file.close()
+
+
+class Corpus:
+    """
+    Read only, memory mapped view of a corpus file of deals
+
+    Parameters
+    ----------
+    path : str
+
+    Notes
+    -----
+    Deals are records of 52 card id bytes, in stock order before dealing, followed in labelled corpora by
+    `solvable` (int8, -1 when unknown) and `solution_length` (int16, -1 when unknown). Nothing is read until a
+    deal is used, so corpora much larger than memory can be sampled at random.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, count, flags = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a deal corpus')
+        self.labelled = bool(flags & LABELLED)
+        dtype = LABELLED_DTYPE if self.labelled else DEAL_DTYPE
+        if count:
+            self.records = np.memmap(path, dtype, mode='r', offset=HEADER.size, shape=(count,))
+        else:
+            # `numpy.memmap` refuses empty maps
+            self.records = np.zeros(0, dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records['order'][index]
+
+    @property
+    def orders(self):
+        return self.records['order']
+
+    @property
+    def solvable(self):
+        return self.records['solvable'] if self.labelled else None
+
+    @property
+    def solution_length(self):
+        return self.records['solution_length'] if self.labelled else None
+
+    def game(self, index, engine='object'):
+        return Game.from_deal(self.records['order'][index], engine=engine)
+
+
+def write(path, seed, start, stop, solver=None):
+    """
+    Writes deals `start` up to `stop` of the stream of `solitaire.deal_seed(seed, index)` to a corpus
+
+    Parameters
+    ----------
+    path : str
+    seed, start, stop : int
+    solver : solitaire.solver.Solver, optional
+        Labels every deal with the result of solving it, deals it gives up on stay unknown
+
+    Returns
+    -------
+    Corpus:
+        The corpus written
+    """
+    from solitaire.solver import SOLVED, UNSOLVABLE
+
+    with Writer(path, labelled=solver is not None) as writer:
+        for index in range(start, stop):
+            order = deal_order(deal_seed(seed, index))
+            if solver is None:
+                writer.write(order)
+                continue
+            solution = solver.solve(Game.from_deal(order, engine='array'))
+            solvable = {SOLVED: 1, UNSOLVABLE: 0}.get(solution.status, UNKNOWN)
+            writer.write(order, solvable, len(solution.moves) if solvable == 1 else UNKNOWN)
+    return Corpus(path)
@@ -0,0 +1,215 @@
+import math, random, time, weakref
+import numpy as np
+from collections import OrderedDict
+from solitaire import OBSERVATION_SHAPES, rollout
+from solitaire.pruning import Pruner, DUPLICATES, EMPTY_TO_EMPTY, FOUNDATION_RETURN
+
+
+DRAW = 'draw'
+
+
+class Node:
+    __slots__ = ('reward', 'actions', 'children', 'visits', 'pending', 'total')
+
+    def __init__(self, reward=0.0):
+        # Reward collected on the way into this node
+        self.reward = reward
+        # Actions not expanded yet, None until the node is first reached
+        self.actions = None
+        self.children = {}
+        self.visits = 0
+        # Simulations that went through this node and are waiting for a batched evaluation
+        self.pending = 0
+        # Sum of the returns from this node onwards
+        self.total = 0.0
+
+    def value(self):
+        return self.total / self.visits if self.visits else 0.0
+
+
+class MCTS:
+    """
+    Monte Carlo tree search over a `Game` or `ArrayGame`
+
+    Parameters
+    ----------
+    evaluator : callable, optional
+        Takes an OrderedDict of observations stacked over leaves, shaped like `OBSERVATION_SHAPES` with a leading
+        batch axis, and returns one value per leaf. Leaves are valued by random rollouts otherwise
+    batch_size : int, optional
+        Leaves collected before each call to `evaluator`
+    max_simulations : int, optional
+        Simulations per search
+    max_seconds : float, optional
+        Wall clock time per search, the search stops at whichever budget runs out first
+    exploration : float, optional
+        UCT exploration constant, applied to values rescaled to [0, 1] by the lowest and highest seen so far
+    rollout_depth : int, optional
+        Random actions played from each leaf when there is no evaluator
+    gamma : float, optional
+        Discount applied per action
+    seed : int, optional
+        Seeds rollouts and tie breaking
+    prune : bool, optional
+        Leave out of the tree the moves the dominance rules of `solitaire.pruning.Pruner` drop
+
+    Notes
+    -----
+    Search plays actions on the game itself and takes them back with `undo`, so nothing is copied per simulation.
+    Actions are the engine's `legal_moves` plus 'draw' while the stock or waste has cards. The tree below the
+    chosen action is kept, and reused by the next `search` when it is on the same game object in the position it
+    leads to, as told by `hash`, since `Game` actions hold that game's cards. Simulations waiting on a batched evaluation count as visits that returned nothing, so one batch
+    spreads over different leaves.
+    """
+
+    def __init__(self, evaluator=None, batch_size=1, max_simulations=1000, max_seconds=None, exploration=1.0,
+                 rollout_depth=10, gamma=1.0, seed=None, prune=False):
+        self.evaluator = evaluator
+        self.batch_size = batch_size if evaluator else 1
+        self.max_simulations = max_simulations
+        self.max_seconds = max_seconds
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.gamma = gamma
+        self.rng = random.Random(seed)
+        self.pruner = Pruner((DUPLICATES, EMPTY_TO_EMPTY, FOUNDATION_RETURN)) if prune else None
+        # The kept tree, the hash of its position and a weak reference to the game it was searched on
+        self.root, self.key, self.game = None, None, None
+        self.minimum, self.maximum = math.inf, -math.inf
+
+    def actions(self, game):
+        # Moves onto different empty tableaus lead to the same position
+        actions = self.pruner.prune(game) if self.pruner else list(dict.fromkeys(game.legal_moves()))
+        if game.can_draw():
+            actions.append(DRAW)
+        return actions
+
+    @staticmethod
+    def play(game, action):
+        if action == DRAW:
+            reward = game.get_draw_reward()
+            game.draw()
+        else:
+            reward = game.get_move_reward(action)
+            game.move_cards(action)
+        return reward
+
+    def normalize(self, value):
+        if self.maximum > self.minimum:
+            return (value - self.minimum) / (self.maximum - self.minimum)
+        return 0.5
+
+    def select(self, node):
+        visits = node.visits + node.pending
+        best, best_score = None, -math.inf
+        for action, child in node.children.items():
+            n = child.visits + child.pending
+            if n == 0:
+                return action, child
+            # Pending simulations count as visits that returned nothing
+            q = child.reward + self.gamma * child.total / n
+            score = self.normalize(q) + self.exploration * math.sqrt(math.log(visits) / n)
+            if score > best_score:
+                best, best_score = (action, child), score
+        return best
+
+    def descend(self, game):
+        # Walks down to a new leaf, playing the actions on the way, and returns the nodes passed
+        node, path = self.root, [self.root]
+        while True:
+            node.pending += 1
+            if node.actions is None:
+                node.actions = self.actions(game)
+                self.rng.shuffle(node.actions)
+            if node.actions:
+                action = node.actions.pop()
+                child = node.children[action] = Node(self.play(game, action))
+                child.pending += 1
+                path.append(child)
+                return path
+            if not node.children:
+                return path
+            action, node = self.select(node)
+            self.play(game, action)
+            path.append(node)
+
+    def backup(self, path, value):
+        for node in reversed(path):
+            node.pending -= 1
+            node.visits += 1
+            node.total += value
+            value = node.reward + self.gamma * value
+            self.minimum, self.maximum = min(self.minimum, value), max(self.maximum, value)
+
+    def search(self, game):
+        """
+        Parameters
+        ----------
+        game : Game or ArrayGame
+            Position to plan from, left as it was when the search returns
+
+        Returns
+        -------
+        Node:
+            Root of the search tree
+        """
+        key = game.hash()
+        if self.root is None or key != self.key or self.game() is not game:
+            self.root, self.key, self.game = Node(), key, weakref.ref(game)
+
+        start = time.perf_counter()
+        simulations = 0
+        while simulations < self.max_simulations:
+            if self.max_seconds is not None and time.perf_counter() - start > self.max_seconds:
+                break
+
+            paths, leaves = [], []
+            for x in range(min(self.batch_size, self.max_simulations - simulations)):
+                path = self.descend(game)
+                paths.append(path)
+                if self.evaluator is None:
+                    leaves.append(rollout(game, self.rollout_depth, self.rng))
+                else:
+                    leaves.append({k: np.array(v) for k, v in game.observation().items()})
+                for node in path[1:]:
+                    game.undo()
+            simulations += len(paths)
+
+            if self.evaluator is None:
+                values = leaves
+            else:
+                observations = OrderedDict((k, np.stack([o[k] for o in leaves])) for k in OBSERVATION_SHAPES)
+                values = self.evaluator(observations)
+            for path, value in zip(paths, values):
+                self.backup(path, float(value))
+
+            if not self.root.children and not self.root.actions:
+                break
+        return self.root
+
+    def act(self, game):
+        """
+        Parameters
+        ----------
+        game : Game or ArrayGame
+
+        Returns
+        -------
+        tuple or str:
+            The most visited action, a move from `game.legal_moves()` or 'draw', None when there is none
+        """
+        root = self.search(game)
+        if not root.children:
+            return None
+        action, child = max(root.children.items(), key=lambda x: x[1].visits)
+
+        # Keep the subtree for the position the action leads to
+        self.play(game, action)
+        self.root, self.key = child, game.hash()
+        game.undo()
+        return action
+
+
+def act(game, **kwargs):
+    """Chooses an action for `game`, a `Game` or `ArrayGame`, with an `MCTS` built from `kwargs`"""
+    return MCTS(**kwargs).act(game)
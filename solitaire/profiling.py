@@ -0,0 +1,254 @@
+import functools, glob, json, os, sys, time
+import multiprocessing.util
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from solitaire import Game, ArrayGame, Deck, FOUNDATION_BASES
+
+
+ENV_FLAG = 'SOLITAIRE_PROFILE'
+
+
+class Stats:
+    """
+    Call counts, cumulative seconds and value histograms, keyed by name
+
+    Notes
+    -----
+    Times are inclusive, `Game.state` also counts the `legal_moves` call it makes.
+    """
+
+    def __init__(self):
+        self.calls = Counter()
+        self.seconds = Counter()
+        self.histograms = {}
+
+    def __eq__(self, other):
+        return self.to_dict() == other.to_dict()
+
+    def record(self, name, seconds):
+        self.calls[name] += 1
+        self.seconds[name] += seconds
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Counter()
+        histogram[value] += 1
+
+    def clear(self):
+        self.calls.clear()
+        self.seconds.clear()
+        self.histograms.clear()
+
+    def merge(self, other):
+        self.calls.update(other.calls)
+        self.seconds.update(other.seconds)
+        for name, histogram in other.histograms.items():
+            self.histograms.setdefault(name, Counter()).update(histogram)
+        return self
+
+    def to_dict(self):
+        return OrderedDict([
+            ('calls', dict(self.calls)),
+            ('seconds', dict(self.seconds)),
+            ('histograms', {name: {str(k): v for k, v in sorted(h.items())} for name, h in self.histograms.items()})
+        ])
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.calls.update(data['calls'])
+        stats.seconds.update(data['seconds'])
+        for name, histogram in data['histograms'].items():
+            stats.histograms[name] = Counter({int(k): v for k, v in histogram.items()})
+        return stats
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def report(self):
+        lines = [f"{'name':<24} {'calls':>10} {'seconds':>10} {'us/call':>10}"]
+        for name, calls in sorted(self.calls.items()):
+            seconds = self.seconds[name]
+            lines.append(f'{name:<24} {calls:>10} {seconds:>10.3f} {seconds / calls * 1e6:>10.2f}')
+        for name, histogram in sorted(self.histograms.items()):
+            total = sum(histogram.values())
+            mean = sum(k * v for k, v in histogram.items()) / total
+            lines.append(f'{name}: mean {mean:.2f}, ' + ', '.join(f'{k}: {v}' for k, v in sorted(histogram.items())))
+        return '\n'.join(lines)
+
+
+def merge(paths):
+    """Merges the `Stats` dumped to every file in `paths`, which may be glob patterns"""
+    stats = Stats()
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            stats.merge(Stats.load(path))
+    return stats
+
+
+def _game_pile_length(game, move):
+    # Cards on the pile a move landed on
+    return len(move[0].container.cards) - 1
+
+def _array_pile_length(game, move):
+    pile = game.where[move[1]]
+    if pile < 7:
+        return len(game.tableaus[pile])
+    top = game.foundations[pile - 7]
+    return 0 if top in FOUNDATION_BASES else (top - 1) % 13 + 1
+
+def _branching_factor(game, moves):
+    return len(moves)
+
+
+def _targets():
+    # (name, class, method, histogram name, function of the instance and the call's argument or result)
+    targets = [
+        ('Game.legal_moves', Game, 'legal_moves', 'branching_factor', _branching_factor),
+        ('Game.move_cards', Game, 'move_cards', 'pile_length', _game_pile_length),
+        ('Game.state', Game, 'state', None, None),
+        ('Deck.draw', Deck, 'draw', None, None),
+        ('Deck.rebuild', Deck, 'rebuild', None, None),
+        ('ArrayGame.legal_moves', ArrayGame, 'legal_moves', 'branching_factor', _branching_factor),
+        ('ArrayGame.move_cards', ArrayGame, 'move_cards', 'pile_length', _array_pile_length),
+        ('ArrayGame.state', ArrayGame, 'state', None, None),
+        ('ArrayGame.draw', ArrayGame, 'draw', None, None),
+        ('ArrayGame.rebuild', ArrayGame, 'rebuild', None, None),
+    ]
+    try:
+        from gym_solitaire.envs.env import SolitaireEnv
+        targets.append(('SolitaireEnv.step', SolitaireEnv, 'step', None, None))
+    except ImportError:
+        pass
+    return targets
+
+
+_originals = {}
+_stats = Stats()
+
+
+def _wrap(name, function, histogram, value):
+    clock = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        start = clock()
+        result = function(self, *args, **kwargs)
+        _stats.record(name, clock() - start)
+        if histogram:
+            # Moves are measured from their argument, move lists from the result
+            _stats.observe(histogram, value(self, args[0] if args else result))
+        return result
+    return wrapper
+
+
+def enabled():
+    return bool(_originals)
+
+
+def enable(stats=None):
+    """
+    Wraps the instrumented methods so every call is counted and timed into `stats`
+
+    Parameters
+    ----------
+    stats : Stats, optional
+        Where to record, the module wide `Stats` by default
+
+    Returns
+    -------
+    Stats:
+        The `Stats` being recorded into
+
+    Notes
+    -----
+    The classes get their original methods back on `disable`, so instrumentation costs nothing while it is off.
+    `SolitaireEnv.step` is wrapped once `gym_solitaire.envs.env` can be imported, and that module wraps it
+    itself when it is imported later.
+    """
+    global _stats
+    if stats is not None:
+        _stats = stats
+    for name, cls, method, histogram, value in _targets():
+        if (cls, method) not in _originals:
+            function = cls.__dict__[method]
+            _originals[cls, method] = function
+            setattr(cls, method, _wrap(name, function, histogram, value))
+    return _stats
+
+
+def disable():
+    for (cls, method), function in _originals.items():
+        setattr(cls, method, function)
+    _originals.clear()
+
+
+def stats():
+    return _stats
+
+
+@contextmanager
+def instrument(stats=None):
+    """
+    Records into a new `Stats`, or `stats`, inside the block
+
+    Examples
+    --------
+    >>> with instrument() as stats:
+    ...     game = Game(seed=1)
+    ...     game.legal_moves()
+    >>> stats.calls['Game.legal_moves']
+    1
+    """
+    global _stats
+    previous, was_enabled = _stats, enabled()
+    stats = enable(Stats() if stats is None else stats)
+    try:
+        yield stats
+    finally:
+        _stats = previous
+        if not was_enabled:
+            disable()
+
+
+def _dump_on_exit(path):
+    # Worker processes exit through `os._exit`, which skips atexit, so dump from a multiprocessing finalizer
+    def dump():
+        _stats.dump(path.format(pid=os.getpid()))
+    multiprocessing.util.Finalize(None, dump, exitpriority=0)
+
+
+def _after_fork(path):
+    _stats.clear()
+    _dump_on_exit(path)
+
+
+def enable_from_environment():
+    """
+    Turns instrumentation on when the `SOLITAIRE_PROFILE` environment variable is set
+
+    Notes
+    -----
+    Any value enables it. A value other than '1' is a path, where '{pid}' is replaced by the process id, that
+    every process dumps its `Stats` to when it exits, for `merge` or `python -m solitaire.profiling` to combine.
+    """
+    flag = os.environ.get(ENV_FLAG)
+    if not flag:
+        return
+    enable()
+    if flag != '1':
+        _dump_on_exit(flag)
+        multiprocessing.util.register_after_fork(_stats, lambda stats: _after_fork(flag))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('usage: python -m solitaire.profiling STATS.json [STATS.json ...]')
+    print(merge(sys.argv[1:]).report())
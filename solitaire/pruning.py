@@ -0,0 +1,166 @@
+from collections import deque
+from solitaire import Game, EMPTY_TABLEAU, STOCK, is_safe
+
+
+# Rules that never remove a move needed to win, and the repetition check, which needs the positions played
+DUPLICATES, EMPTY_TO_EMPTY, FOUNDATION_RETURN, REPEAT = 'duplicates', 'empty_to_empty', 'foundation_return', 'repeat'
+RULES = (DUPLICATES, EMPTY_TO_EMPTY, FOUNDATION_RETURN, REPEAT)
+TABLEAU, FOUNDATION, DECK = 'tableau', 'foundation', 'deck'
+
+
+def describe(game, move):
+    """
+    Parameters
+    ----------
+    game : Game or ArrayGame
+    move : tuple
+        A move from `game.legal_moves()`
+
+    Returns
+    -------
+    tuple:
+        The move as card ids, whether its target is an empty tableau, the kind of pile the target and the source
+        are on, 'tableau', 'foundation' or 'deck', and whether the source is the bottom card of its tableau
+    """
+    target, source = move
+    if isinstance(game, Game):
+        ids = target.number, source.number
+        to = FOUNDATION if target.location == 'foundation' else TABLEAU
+        origin = source.location
+        bottom = origin == TABLEAU and source.position == 1
+    else:
+        ids = move
+        to = TABLEAU if target == EMPTY_TABLEAU or game.where[target] < 7 else FOUNDATION
+        pile = game.where[source]
+        origin = TABLEAU if pile < 7 else FOUNDATION if pile < STOCK else DECK
+        bottom = origin == TABLEAU and game.tableaus[pile][0] == source
+    return ids, ids[0] == EMPTY_TABLEAU, to, origin, bottom
+
+
+class Pruner:
+    """
+    Legal moves without the ones that cannot help
+
+    Parameters
+    ----------
+    rules : iterable, optional
+        Rules from `RULES` to apply:
+        'duplicates' keeps one of the moves of a card onto different empty tableaus,
+        'empty_to_empty' drops moving a whole tableau onto an empty one,
+        'foundation_return' drops taking a card off its foundation when `is_safe` says no card can need it,
+        'repeat' drops moves back into any of the last `horizon` positions seen by `moves`
+    horizon : int, optional
+        Positions remembered for 'repeat'
+
+    Notes
+    -----
+    The first three rules are dominance rules, a win never needs the moves they drop. 'repeat' compares canonical
+    `hash`es, playing and undoing every candidate move, and only makes sense when `moves` is called once per
+    position played, as in an episode or a rollout. Search that backtracks should use `prune`, or `reset` between
+    lines of play.
+    """
+
+    def __init__(self, rules=RULES, horizon=16):
+        unknown = set(rules) - set(RULES)
+        if unknown:
+            raise ValueError(f'{sorted(unknown)} are not in {RULES}')
+        self.rules = frozenset(rules)
+        self.recent = deque(maxlen=horizon)
+
+    def reset(self):
+        self.recent.clear()
+
+    def prune(self, game, moves=None):
+        """
+        Parameters
+        ----------
+        game : Game or ArrayGame
+        moves : list, optional
+            Moves of `game` to prune, `game.legal_moves()` by default
+
+        Returns
+        -------
+        list:
+            The moves the dominance rules keep, in order
+        """
+        if moves is None:
+            moves = game.legal_moves()
+        rules = self.rules
+        heights = game.heights() if FOUNDATION_RETURN in rules else None
+        kept, seen = [], set()
+        for move in moves:
+            ids, empty, to, origin, bottom = describe(game, move)
+            if DUPLICATES in rules:
+                if ids in seen:
+                    continue
+                seen.add(ids)
+            if EMPTY_TO_EMPTY in rules and empty and bottom:
+                continue
+            if FOUNDATION_RETURN in rules and origin == FOUNDATION and to == TABLEAU and is_safe(ids[1], heights):
+                continue
+            kept.append(move)
+        return kept
+
+    def moves(self, game):
+        """
+        Returns
+        -------
+        list:
+            `prune` of the legal moves, then without the moves back into a recent position when 'repeat' is on.
+            The position of `game` is remembered as a recent one
+        """
+        moves = self.prune(game)
+        if REPEAT not in self.rules:
+            return moves
+
+        key = game.hash(canonical=True)
+        if not self.recent or self.recent[-1] != key:
+            self.recent.append(key)
+        kept = []
+        for move in moves:
+            game.move_cards(move)
+            repeated = game.hash(canonical=True) in self.recent
+            game.undo()
+            if not repeated:
+                kept.append(move)
+        return kept
+
+
+# Draws that go through what is left of the stock, a rebuild and then the whole stock again
+CYCLE_DRAWS = 2 * (24 // 3 + 1)
+# Moves that can change what is possible next, see `dead_end`
+PROGRESS = Pruner((EMPTY_TO_EMPTY, FOUNDATION_RETURN))
+
+
+def dead_end(game):
+    """
+    Parameters
+    ----------
+    game : Game or ArrayGame
+
+    Returns
+    -------
+    bool:
+        Whether no move but the ones `Pruner` calls useless can be played now or after any number of draws, so the
+        game can never change again
+
+    Notes
+    -----
+    Positions with such a move return straight away. Otherwise the stock is drawn through on the game itself,
+    which is left as it was.
+    """
+    if PROGRESS.prune(game):
+        return False
+    if not game.can_draw():
+        return True
+
+    played, dead = 0, True
+    for x in range(CYCLE_DRAWS):
+        game.draw()
+        played += 1
+        if PROGRESS.prune(game):
+            dead = False
+            break
+    for x in range(played):
+        game.undo()
+    return dead
@@ -0,0 +1,160 @@
+import numbers, time
+from collections import OrderedDict, namedtuple
+from solitaire import Game, ArrayGame
+from solitaire.pruning import Pruner, DUPLICATES, EMPTY_TO_EMPTY, FOUNDATION_RETURN
+
+
+DRAW = 'draw'
+SOLVED, UNSOLVABLE, LIMIT = 'solved', 'unsolvable', 'limit'
+WON = bytes((13, 26, 39, 52))
+
+Solution = namedtuple('Solution', ['status', 'moves', 'nodes', 'seconds'])
+
+
+def position_key(game):
+    # Positions that only differ by the order of their tableaus play out the same way
+    return game.hash(canonical=True)
+
+
+class TranspositionTable:
+    """
+    Set of visited position keys that evicts the least recently seen ones past `max_memory` bytes
+
+    Notes
+    -----
+    `ENTRY_SIZE` is a rough per-key cost of the key object and its OrderedDict slot, used to turn the memory cap
+    into a number of entries.
+    """
+
+    ENTRY_SIZE = 256
+
+    def __init__(self, max_memory):
+        self.max_entries = max(1, int(max_memory) // self.ENTRY_SIZE)
+        self.keys = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        if key in self.keys:
+            self.keys.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key):
+        self.keys[key] = None
+        if len(self.keys) > self.max_entries:
+            self.keys.popitem(last=False)
+            self.evictions += 1
+
+
+class Solver:
+    """
+    Depth first search for a winning sequence of moves and draws
+
+    Parameters
+    ----------
+    max_nodes : int, optional
+        Positions to expand before giving up
+    max_seconds : float, optional
+        Wall clock time to search before giving up
+    max_memory : int, optional
+        Approximate bytes the transposition table may use
+    prune : bool, optional
+        Skip the moves the dominance rules of `solitaire.pruning.Pruner` drop
+
+    Notes
+    -----
+    Search runs on an `ArrayGame` with `move_cards`/`draw` and `undo`, trying moves that `get_move_reward`
+    scores first, then a draw, then the remaining moves. Solutions are lists of 'draw' or `(target, source)` card
+    id pairs, the values of `utility.action_mapping`, that replay on `ArrayGame(seed)` from the deal.
+    """
+
+    def __init__(self, max_nodes=1000000, max_seconds=None, max_memory=256 * 2 ** 20, prune=False):
+        self.max_nodes = max_nodes
+        self.max_seconds = max_seconds
+        self.max_memory = max_memory
+        # The transposition table already cuts repeated positions
+        self.pruner = Pruner((DUPLICATES, EMPTY_TO_EMPTY, FOUNDATION_RETURN)) if prune else None
+
+    def actions(self, game):
+        # Scoring moves best first, then drawing, then moves that score nothing or lose points
+        moves = self.pruner.prune(game) if self.pruner else game.legal_moves()
+        # `score_moves` pays numpy's call overhead, more than scoring the few moves of one position one by one
+        scored = sorted(((game.get_move_reward(m), m) for m in moves), key=lambda x: -x[0])
+        actions = [m for reward, m in scored if reward > 0]
+        if game.can_draw():
+            actions.append(DRAW)
+        actions.extend(m for reward, m in scored if reward <= 0)
+        return actions
+
+    @staticmethod
+    def play(game, action):
+        if action == DRAW:
+            game.draw()
+        else:
+            game.move_cards(action)
+
+    def solve(self, game):
+        """
+        Parameters
+        ----------
+        game : ArrayGame, Game or int
+            Position to solve, a `Game` is solved on a copy made by `ArrayGame.from_game`, or the seed of a deal
+
+        Returns
+        -------
+        Solution:
+            `status` is 'solved', 'unsolvable' or 'limit', `moves` the winning actions when solved
+        """
+        if isinstance(game, Game):
+            game = ArrayGame.from_game(game)
+        elif isinstance(game, numbers.Integral):
+            game = ArrayGame(seed=game)
+        elif not isinstance(game, ArrayGame):
+            raise TypeError(f'Cannot solve {type(game).__name__}, pass an ArrayGame, a Game or a seed')
+
+        start = time.perf_counter()
+        snapshot = game.snapshot()
+        table = TranspositionTable(self.max_memory)
+        table.add(position_key(game))
+        path, stack, nodes = [], [iter(self.actions(game))], 0
+
+        def result(status):
+            moves = list(path) if status == SOLVED else []
+            game.restore(snapshot)
+            return Solution(status, moves, nodes, time.perf_counter() - start)
+
+        while stack:
+            if game.foundations == WON:
+                return result(SOLVED)
+
+            for action in stack[-1]:
+                self.play(game, action)
+                key = position_key(game)
+                if key in table:
+                    game.undo()
+                    continue
+                table.add(key)
+                nodes += 1
+                path.append(action)
+                stack.append(iter(self.actions(game)))
+                break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
+                    game.undo()
+
+            if nodes >= self.max_nodes:
+                return result(LIMIT)
+            if self.max_seconds is not None and nodes % 1024 == 0 and time.perf_counter() - start > self.max_seconds:
+                return result(LIMIT)
+
+        return result(UNSOLVABLE)
+
+
+def solve(game, **kwargs):
+    """Solves `game`, an `ArrayGame`, a `Game` or the seed of a deal, with a `Solver` built from `kwargs`"""
+    return Solver(**kwargs).solve(game)
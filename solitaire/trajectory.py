@@ -0,0 +1,203 @@
+import struct
+from collections import namedtuple
+from solitaire import Game, DECK_NUMBERS
+from utility import encode_action, decode_action
+
+
+# File header, then chunks of episodes each behind a (episodes, bytes) header
+MAGIC = b'SOLTRAJ1'
+CHUNK = struct.Struct('<II')
+CHUNK_SIZE = 2 ** 20
+
+DRAW, UNDO = 'draw', 'undo'
+
+Episode = namedtuple('Episode', ['deal', 'actions'])
+Step = namedtuple('Step', ['action', 'reward', 'observation', 'legal_moves'])
+
+
+def write_varint(out, value):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, i):
+    value = shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, i
+        shift += 7
+
+def zigzag(n):
+    # Small negative and positive numbers both get short varints
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+def unzigzag(n):
+    return n // 2 if n % 2 == 0 else -(n + 1) // 2
+
+
+def deal_of(game):
+    # Card ids in stock order before dealing, what `Game.from_deal` takes back
+    if isinstance(game, Game):
+        return [c.number for c in game.deck.order]
+    return sorted(DECK_NUMBERS, key=game.position.__getitem__)
+
+def encode(action):
+    # 'draw', 'undo' or a move of either engine as an `utility.action_mapping` key
+    if isinstance(action, str):
+        return encode_action(action)
+    target, source = action
+    return encode_action((getattr(target, 'number', target), getattr(source, 'number', source)))
+
+
+def encode_episode(out, deal, actions):
+    out.extend(deal)
+    write_varint(out, len(actions))
+    previous = 0
+    for code in actions:
+        write_varint(out, zigzag(code - previous))
+        previous = code
+
+def decode_episode(data, i):
+    deal = list(data[i:i + 52])
+    n, i = read_varint(data, i + 52)
+    actions, code = [], 0
+    for x in range(n):
+        delta, i = read_varint(data, i)
+        code += unzigzag(delta)
+        actions.append(code)
+    return Episode(deal, actions), i
+
+
+class Recorder:
+    """
+    Writes episodes as their deal and their actions to a trajectory file, see `read` and `replay`
+
+    Parameters
+    ----------
+    path : str
+    chunk_size : int, optional
+        Bytes of episodes buffered before they are written out as a chunk
+
+    Notes
+    -----
+    An episode is its 52 card deal, the number of actions, then each action's `utility.action_mapping` key as a
+    zigzag varint of the difference from the previous one, about two bytes an action. Episodes in progress when
+    the recorder is not closed are lost, along with the last chunk.
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.buffer = bytearray()
+        self.episodes = 0
+        self.deal, self.actions = None, []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start(self, game):
+        # Ends the current episode and starts one from `game`, which must not have been played yet
+        self.finish()
+        self.deal, self.actions = deal_of(game), []
+
+    def record(self, action):
+        """
+        Parameters
+        ----------
+        action : str or tuple
+            'draw', 'undo' or a move as passed to `move_cards`, of either engine
+        """
+        self.actions.append(encode(action))
+
+    def finish(self):
+        # Episodes without actions, like the deal a reset replaces, are dropped
+        if not self.actions:
+            self.deal = None
+            return
+        encode_episode(self.buffer, self.deal, self.actions)
+        self.episodes += 1
+        self.deal, self.actions = None, []
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.episodes:
+            self.file.write(CHUNK.pack(self.episodes, len(self.buffer)))
+            self.file.write(self.buffer)
+            self.buffer, self.episodes = bytearray(), 0
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.finish()
+        self.flush()
+        self.file.close()
+
+
+def read(path):
+    """Yields the `Episode` of every episode in a trajectory file, reading one chunk at a time"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a trajectory file')
+        while True:
+            header = f.read(CHUNK.size)
+            if len(header) < CHUNK.size:
+                return
+            episodes, size = CHUNK.unpack(header)
+            data, i = f.read(size), 0
+            for x in range(episodes):
+                episode, i = decode_episode(data, i)
+                yield episode
+
+
+def replay(episode, engine='object', observation='state'):
+    """
+    Plays an episode back, yielding a `Step` for the deal and one after every action
+
+    Parameters
+    ----------
+    episode : Episode
+    engine : str, optional
+        One of `ENGINES`
+    observation : str, optional
+        'state' for `state()` dicts, 'array' for the views of `observation()`, updated in place, or None
+
+    Notes
+    -----
+    Nothing is computed ahead of the step being asked for. `action` is the `utility.action_mapping` value
+    played, None for the deal, and `reward` what `SolitaireEnv.step` paid for it.
+    """
+    game = Game.from_deal(episode.deal, engine=engine)
+
+    def step(action, reward):
+        if observation == 'state':
+            observed = game.state()
+        elif observation == 'array':
+            observed = game.observation()
+        else:
+            observed = None
+        return Step(action, reward, observed, game.legal_moves())
+
+    yield step(None, 0.0)
+    for code in episode.actions:
+        action = decode_action(code)
+        if action == DRAW:
+            reward = game.get_draw_reward()
+            game.draw()
+        elif action == UNDO:
+            reward = 0.0
+            game.undo()
+        else:
+            move = tuple(game.find_number(n) for n in action)
+            reward = game.get_move_reward(move)
+            game.move_cards(move)
+        yield step(action, reward)
@@ -0,0 +1,139 @@
+import pytest
+import numpy as np
+import hypothesis.strategies as st
+from hypothesis import given, settings
+from solitaire import Game, ArrayGame, CARD
+from utility import get_card
+from gym_solitaire.envs.vec_env import encode_observation
+
+SEEDS = (1, 2, 3)
+
+
+def dump_moves(moves):
+    return [(t.dump(), s.dump()) for (t, s) in moves]
+
+
+class TestArrayGame:
+
+    def test_engine_selection(self):
+        assert isinstance(Game(seed=1, engine='array'), ArrayGame)
+        assert isinstance(Game(seed=1), Game)
+
+        with pytest.raises(ValueError):
+            Game(seed=1, engine='cards')
+
+    def test_deal(self):
+        game, array_game = Game(seed=1), ArrayGame(seed=1)
+        print(); array_game.render()
+
+        assert game.state() == array_game.state()
+
+    @settings(deadline=None, max_examples=20)
+    @given(seed=st.sampled_from(SEEDS), choices=st.randoms(use_true_random=False))
+    def test_matches_game(self, seed, choices):
+        game, array_game = Game(seed=seed), ArrayGame(seed=seed)
+        for x in range(300):
+            moves = game.legal_moves()
+            assert dump_moves(moves) == array_game.legal_moves()
+
+            if moves and choices.random() < 0.8:
+                i = choices.randrange(len(moves))
+                # Empty tableau targets resolve to the first empty tableau, like `Game.find_card`
+                target, source = moves[i]
+                move = game.find_card(target.rank, target.suit), source
+                assert game.get_move_reward(move) == array_game.get_move_reward(array_game.legal_moves()[i])
+                game.move_cards(move)
+                array_game.move_cards(array_game.legal_moves()[i])
+            else:
+                assert game.get_draw_reward() == array_game.get_draw_reward()
+                game.draw()
+                array_game.draw()
+
+            assert game.state() == array_game.state()
+            assert game.hash() == array_game.hash()
+            assert game.hash(canonical=True) == array_game.hash(canonical=True)
+            assert game.deck.times_rebuilt == array_game.times_rebuilt
+            for key, value in encode_observation(game.state()).items():
+                assert np.array_equal(array_game.observation()[key], value)
+
+    @settings(deadline=None, max_examples=20)
+    @given(seed=st.sampled_from(SEEDS), choices=st.randoms(use_true_random=False))
+    def test_undo_and_restore(self, seed, choices):
+        game = ArrayGame(seed=seed)
+        snapshot = game.snapshot()
+        states = [game.state()]
+        for x in range(300):
+            moves = game.legal_moves()
+            if moves and choices.random() < 0.8:
+                game.move_cards(choices.choice(moves))
+            else:
+                game.draw()
+            states.append(game.state())
+
+        middle = game.snapshot()
+        for x in range(20):
+            game.draw()
+        game.restore(middle)
+        assert game.state() == states[-1]
+
+        while game.undo():
+            states.pop()
+            assert game.state() == states[-1]
+        assert len(states) == 1
+        assert game.hash() == ArrayGame(seed=seed).hash()
+
+        # Snapshots keep the history's length, not its entries
+        with pytest.raises(ValueError):
+            game.restore(middle)
+        game.restore(snapshot)
+        assert game.state() == states[0]
+        assert not game.undo()
+
+    @given(seed=st.sampled_from(SEEDS), choices=st.randoms(use_true_random=False))
+    def test_from_game(self, seed, choices):
+        game = Game(seed=seed)
+        for x in range(150):
+            moves = game.legal_moves()
+            if moves and choices.random() < 0.7:
+                target, source = choices.choice(moves)
+                game.move_cards((game.find_card(target.rank, target.suit), source))
+            else:
+                game.draw()
+
+        array_game = ArrayGame.from_game(game)
+        assert array_game.state() == game.state()
+        assert array_game.hash() == game.hash()
+        assert array_game.times_rebuilt == game.deck.times_rebuilt
+        assert array_game.legal_moves() == dump_moves(game.legal_moves())
+        assert not array_game.undo()
+
+    def test_legal_moves_cache(self):
+        game = ArrayGame(seed=1)
+        moves = game.legal_moves()
+        assert game.legal_moves() is moves
+        game.action_mask(), game.observation()
+        assert game.legal_moves() is moves
+
+        game.draw()
+        assert game.legal_moves() is not moves
+        game.undo()
+        assert game.legal_moves() == moves
+        assert game.clone().legal_moves() == moves
+
+    def test_illegal_move(self):
+        game = ArrayGame(seed=1)
+        with pytest.raises(ValueError):
+            game.move_cards((game.targets()[0], game.targets()[1]))
+
+    def test_find_card(self):
+        game = ArrayGame(seed=1)
+        assert game.find_card(None, None) is None
+        assert game.find_card(None, 's') == 53
+
+        for t in game.tableaus:
+            assert game.find_card(*get_card(t[-1])) == t[-1]
+        for c in game.stock:
+            assert game.find_card(*get_card(c & CARD)) is None
+
+        game.draw()
+        assert game.find_card(*get_card(game.waste[0])) == game.waste[0]
@@ -0,0 +1,34 @@
+import json
+from solitaire import benchmark
+
+
+class TestBenchmark:
+
+    def test_run(self):
+        report = benchmark.run(seeds=(0, 1), rounds=20, repeat=1)
+        for engine in ('object', 'array'):
+            for path in ('deal', 'legal_moves', 'move_cards', 'draw', 'state', 'env_step', 'random_play'):
+                result = report['results'][f'{engine}.{path}']
+                assert result['calls'] > 0
+                assert result['seconds_per_call'] > 0
+        json.dumps(report)
+
+    def test_compare(self):
+        baseline = {'results': {'object.state': {'seconds_per_call': 1e-5}, 'object.deal': {'seconds_per_call': 1e-4}}}
+        current  = {'results': {'object.state': {'seconds_per_call': 2e-5}, 'object.deal': {'seconds_per_call': 1.1e-4},
+                                'array.state': {'seconds_per_call': 1.0}}}
+
+        regressions = benchmark.compare(baseline, current, threshold=0.25)
+        assert [r[0] for r in regressions] == ['object.state']
+        assert benchmark.compare(baseline, current, threshold=1.5) == []
+
+    def test_main(self, tmp_path):
+        output = tmp_path / 'results.json'
+        args = ['--engine', 'array', '--seeds', '1', '--rounds', '10', '--repeat', '1']
+        assert benchmark.main(args + ['--output', str(output)]) == 0
+
+        report = json.loads(output.read_text())
+        for result in report['results'].values():
+            result['seconds_per_call'] /= 100
+        output.write_text(json.dumps(report))
+        assert benchmark.main(args + ['--compare', str(output)]) == 1
@@ -0,0 +1,48 @@
+import pytest
+import numpy as np
+from solitaire import Game, ArrayGame, deal_order, deal_seed
+from solitaire.corpus import Writer, Corpus, write, UNKNOWN
+from solitaire.solver import Solver
+
+
+class TestCorpus:
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / 'deals.bin')
+        orders = [deal_order(seed) for seed in range(5)]
+        with Writer(path) as writer:
+            writer.write(orders[0])
+            writer.write_many(orders[1:])
+
+        corpus = Corpus(path)
+        assert len(corpus) == 5
+        assert not corpus.labelled and corpus.solvable is None
+        assert isinstance(corpus.records, np.memmap)
+        for seed in range(5):
+            assert list(corpus[seed]) == orders[seed]
+            assert corpus.game(seed).state() == Game(seed=seed).state()
+            assert corpus.game(seed, engine='array').state() == ArrayGame(seed=seed).state()
+
+    def test_labelled(self, tmp_path):
+        corpus = write(str(tmp_path / 'deals.bin'), 1, 10, 13, solver=Solver(max_nodes=2000))
+        assert corpus.labelled and len(corpus) == 3
+        for i, index in enumerate(range(10, 13)):
+            assert list(corpus[i]) == deal_order(deal_seed(1, index))
+            if corpus.solvable[i] == 1:
+                assert corpus.solution_length[i] > 0
+            else:
+                assert corpus.solution_length[i] == UNKNOWN
+
+    def test_invalid(self, tmp_path):
+        path = str(tmp_path / 'deals.bin')
+        with Writer(path) as writer:
+            with pytest.raises(ValueError):
+                writer.write([1] * 52)
+        assert len(Corpus(path)) == 0
+        with pytest.raises(ValueError):
+            Game.from_deal(list(range(52)))
+
+        with open(path, 'wb') as f:
+            f.write(bytes(24))
+        with pytest.raises(ValueError):
+            Corpus(path)
@@ -28,45 +28,82 @@ class TestDeck:
 
     def test_rebuild(self):
         deck = Deck(hidden=False)
-
-        # Shuffle the deck
         deck.shuffle()
-        print()
-        print('times rebuilt:', deck.times_rebuilt)
-        print(f'original deck: {len(deck.cards)} ', deck)
-
-        # Deal a few cards
-        dealt_cards = deck.deal(6)
-        print(f'dealt cards: {len(dealt_cards)}    ', dealt_cards)
+        order = deck.cards
+        assert len(order) == 52 and deck.times_rebuilt == 0
 
-        # Play a few of the dealt cards
-        print('played card:', dealt_cards.pop(3))
-        print('played card:', dealt_cards.pop(1))
+        # Deal a few cards, they leave the deck for good
+        dealt = deck.deal(6)
+        assert dealt == list(order[:6]) and deck.cards == order[6:]
 
-        # Add the unplayed cards back to the end of the deck
-        deck.cards.extend(dealt_cards)
-        print(f'messed up deck: {len(deck.cards)}', deck)
+        # Draw through the stock, play from the waste, then put a card back
+        for x in range(4):
+            deck.draw()
+        played = [deck.pop(), deck.pop()]
+        deck.push(played[1])
+        assert len(deck.cards) + len(deck.waste) == 45
+        with pytest.raises((TypeError, AttributeError)):
+            deck.cards.extend(dealt)
 
-        # Rebuild the deck
-        print(f'order: {len(deck.order)}         ', deck.order)
-        deck.rebuild()
-        print(f'rebuilt deck: {len(deck.cards)}  ', deck)
-        print('times rebuilt:', deck.times_rebuilt)
+        # Rebuilding turns the waste over onto the stock in the original order
+        while deck.cards:
+            deck.draw()
+        hash = deck.hash
+        deck.draw()
+        assert deck.times_rebuilt == 1 and deck.waste == ()
+        assert deck.cards == tuple(c for c in order[6:] if c is not played[0])
+        assert hash != deck.hash
+        rebuilt = deck.hash
+        deck.rehash()
+        assert deck.hash == rebuilt
 
     def test_draw(self):
         deck = Deck(hidden=False)
-        deck.shuffle(); print()
-        print(deck)
-        print(deck.waste)
+        deck.shuffle()
+        order = deck.cards
+        assert deck.waste == ()
 
         for n in range(3):
-            print(f"Draw {n}")
             deck.draw()
-            print(deck)
-            print(deck.waste)
-            played_card = deck.waste.pop(1)
-            print(played_card)
+            waste = deck.waste
+            assert len(waste) == 3 * (n + 1) - n and waste[0] is deck.top()
+            played = deck.pop()
+            assert played is waste[0] and deck.waste == waste[1:]
+            with pytest.raises((TypeError, AttributeError)):
+                deck.waste.pop(1)
 
+        assert deck.cards == order[9:]
         deck.rebuild()
-        print(deck)
-        print(deck.waste)
+        assert deck.waste == () and len(deck.cards) == 49
+
+    def test_draw_order(self):
+        deck = Deck()
+        deck.shuffle()
+        order = deck.cards
+
+        # Draws put three cards at a time on top of the waste, the first of them on top
+        deck.draw()
+        deck.draw()
+        assert deck.waste == order[3:6] + order[0:3]
+        assert deck.cards == order[6:]
+
+        # Playing the waste top leaves the rest of its draw on top
+        played = deck.pop()
+        assert played is order[3]
+        assert deck.top() is order[4]
+        deck.pop(), deck.pop()
+        assert deck.top() is order[0]
+
+        # Putting a card back returns it to its draw
+        deck.push(order[5])
+        assert deck.waste == (order[5],) + order[0:3]
+        assert (deck.stock_size(), deck.waste_size()) == (len(deck.cards), len(deck.waste)) == (46, 4)
+        assert tuple(deck.iter_stock()) == deck.cards and tuple(deck.iter_waste()) == deck.waste
+
+        # Rebuilding turns the waste over onto the stock in the original order
+        while deck.cards:
+            deck.draw()
+        deck.draw()
+        assert deck.times_rebuilt == 1
+        assert deck.cards == order[0:3] + order[5:]
+        assert deck.waste == ()
@@ -0,0 +1,120 @@
+import pytest, random
+import numpy as np
+from gym_solitaire.envs import SolitaireEnv
+from gym_solitaire.envs.vec_env import encode_observation
+from solitaire import Game
+from utility import encode_action, decode_action, NUM_ACTIONS
+
+
+class TestSolitaireEnv:
+
+    @pytest.mark.parametrize('engine', ['object', 'array'])
+    def test_array_observations(self, engine):
+        dict_env = SolitaireEnv({'seed': 3, 'engine': engine})
+        array_env = SolitaireEnv({'seed': 3, 'engine': engine, 'observation': 'array'})
+        choices = random.Random(0)
+
+        observation = array_env.reset()
+        assert array_env.observation_space.contains(observation)
+        assert encode_observation(dict_env.reset()).keys() == observation.keys()
+
+        for x in range(200):
+            action = choices.randrange(1, 8)
+            expected, reward, done, info = dict_env.step(action)
+            observation, array_reward, array_done, info = array_env.step(action)
+
+            assert reward == array_reward
+            for key, value in encode_observation(expected).items():
+                assert np.array_equal(observation[key], value)
+
+    @pytest.mark.parametrize('engine', ['object', 'array'])
+    def test_full_actions(self, engine):
+        env = SolitaireEnv({'seed': 3, 'engine': engine, 'actions': 'full'})
+        game = Game(seed=3, engine=engine)
+        assert env.action_space.n == NUM_ACTIONS
+        env.game = game.clone()
+        choices = random.Random(0)
+
+        mask = env.action_mask()
+        for x in range(200):
+            # An illegal move changes nothing
+            illegal = int(choices.choice(np.nonzero(~mask)[0]))
+            state = env.observe()
+            observation, reward, done, info = env.step(illegal)
+            assert (observation, reward, done) == (state, 0.0, illegal == encode_action('end'))
+
+            legal = [i for i in np.nonzero(mask)[0] if i != encode_action('end')]
+            index = int(choices.choice(legal))
+            action = decode_action(index)
+            if action == 'draw':
+                expected = game.get_draw_reward()
+                game.draw()
+            elif action == 'undo':
+                expected = 0.0
+                game.undo()
+            else:
+                move = tuple(game.find_number(n) for n in action)
+                expected = game.get_move_reward(move)
+                game.move_cards(move)
+
+            observation, reward, done, info = env.step(index)
+            assert reward == expected and not done
+            assert observation == game.state()
+            mask = info['action_mask']
+            assert np.array_equal(mask, game.action_mask())
+
+    def test_auto_play(self):
+        env = SolitaireEnv({'seed': 2, 'actions': 'full', 'auto_play': True})
+        game, choices = env.game.clone(), random.Random(0)
+        steps, played = 0, 0
+        for x in range(300):
+            legal = [i for i in np.nonzero(env.action_mask())[0] if decode_action(i) not in ('end', 'undo')]
+            index = int(choices.choice(legal))
+            observation, reward, done, info = env.step(index)
+
+            action = decode_action(index)
+            if action == 'draw':
+                expected = game.get_draw_reward()
+                game.draw()
+            else:
+                move = tuple(game.find_number(n) for n in action)
+                expected = game.get_move_reward(move)
+                game.move_cards(move)
+            extra, moves = game.auto_play()
+            assert reward == expected + extra
+            assert info['macro_length'] == 1 + len(moves)
+            assert observation == game.state() and game.safe_move() is None
+            steps, played = steps + 1, played + info['macro_length']
+        print(); print(steps, 'steps', played, 'actions')
+
+    @pytest.mark.parametrize('engine', ['object', 'array'])
+    def test_undo_macro(self, engine):
+        # An undo takes back a step together with the safe moves auto-played after it
+        env = SolitaireEnv({'seed': 2, 'actions': 'full', 'auto_play': True, 'engine': engine})
+        choices, states, macros = random.Random(0), [], 0
+        for x in range(300):
+            legal = [i for i in np.nonzero(env.action_mask())[0] if decode_action(i) != 'end']
+            index = int(choices.choice(legal))
+            if decode_action(index) == 'undo':
+                assert env.step(index)[0] == states.pop()
+                continue
+            states.append(env.observe())
+            info = env.step(index)[3]
+            macros += info['macro_length'] > 1
+        assert macros
+        while states:
+            assert env.undo() == states.pop()
+        assert not env.action_mask()[encode_action('undo')]
+
+    def test_dead_ends(self):
+        # Drawing and nothing else comes back to the same positions once the stock has been seen
+        env = SolitaireEnv({'seed': 1, 'dead_ends': True, 'max_repeats': 2})
+        for x in range(200):
+            observation, reward, done, info = env.step(1)
+            if done:
+                break
+        assert done and info == {'TimeLimit.truncated': True}
+        assert max(env.visits.values()) == 3
+
+        env = SolitaireEnv({'seed': 1})
+        assert not any(env.step(1)[2] for x in range(200))
@@ -0,0 +1,280 @@
+import pytest, random
+import numpy as np
+import hypothesis.strategies as st
+from hypothesis import given, settings
+from solitaire import Game, Tableau, deal_seed, deals, is_safe, get_parent_card, move_rewards, FOUNDATION_SCORES
+from solitaire import FROM_TABLEAU, FROM_FOUNDATION, FROM_WASTE
+from utility import cards_mapping, encode_action, NUM_ACTIONS
+from gym_solitaire.envs.vec_env import encode_observation
+
+SEEDS = (1, 2)
+
+
+class TestGame:
+    @given(seed=st.sampled_from(SEEDS))
+    def test_cached_legal_moves(self, seed):
+        game = Game(seed=seed)
+        for x in range(200):
+            possible_moves = game.legal_moves()
+            expected = []
+            for target in game.targets():
+                for source in game.sources():
+                    if source in target.allowable_children():
+                        if target.location == 'foundation' and isinstance(source.container, Tableau) and source.container.target() is not source:
+                            continue
+                        expected.append((target, source))
+            assert possible_moves == expected
+            assert game.legal_moves() is possible_moves
+
+            try:
+                chosen_move = random.choice(possible_moves)
+                game.move_cards(chosen_move)
+            except IndexError:
+                game.deck.draw()
+
+    @given(seed=st.sampled_from(SEEDS))
+    def test_observation(self, seed):
+        game = Game(seed=seed)
+        views = game.observation()
+        for x in range(200):
+            observation = game.observation()
+            assert observation is views
+            for key, value in encode_observation(game.state()).items():
+                assert np.array_equal(observation[key], value)
+                assert np.shares_memory(observation[key], game.buffer)
+
+            try:
+                chosen_move = random.choice(game.legal_moves())
+                game.move_cards(chosen_move)
+            except IndexError:
+                game.deck.draw()
+
+    @given(seed=st.sampled_from(SEEDS))
+    def test_undo(self, seed):
+        game = Game(seed=seed)
+        states = [game.state()]
+        for x in range(200):
+            try:
+                chosen_move = random.choice(game.legal_moves())
+                game.move_cards(chosen_move)
+            except IndexError:
+                game.deck.draw()
+            states.append(game.state())
+
+        while game.undo():
+            states.pop()
+            assert game.state() == states[-1]
+        assert len(states) == 1
+
+    @given(seed=st.sampled_from(SEEDS))
+    def test_snapshot(self, seed):
+        game = Game(seed=seed)
+        for x in range(50):
+            game.deck.draw()
+        snapshot, state = game.snapshot(), game.state()
+
+        for x in range(200):
+            try:
+                chosen_move = random.choice(game.legal_moves())
+                game.move_cards(chosen_move)
+            except IndexError:
+                game.deck.draw()
+
+        game.restore(snapshot)
+        assert game.state() == state
+        game.undo()
+
+    @given(seed=st.sampled_from(SEEDS))
+    def test_hash(self, seed):
+        game = Game(seed=seed)
+        hashes = [game.hash()]
+        for x in range(200):
+            try:
+                chosen_move = random.choice(game.legal_moves())
+                game.move_cards(chosen_move)
+            except IndexError:
+                game.deck.draw()
+            hashes.append(game.hash())
+
+            # Incremental hashes match hashes computed from scratch
+            expected = game.hash(), game.hash(canonical=True)
+            game.restore(game.snapshot())
+            assert (game.hash(), game.hash(canonical=True)) == expected
+
+        while game.undo():
+            hashes.pop()
+            assert game.hash() == hashes[-1]
+
+    def test_canonical_hash(self):
+        game = Game(seed=1)
+        key, canonical = game.hash(), game.hash(canonical=True)
+
+        game.tableaus[0], game.tableaus[6] = game.tableaus[6], game.tableaus[0]
+        assert game.hash() != key
+        assert game.hash(canonical=True) == canonical
+        assert Game(seed=2).hash(canonical=True) != canonical
+
+    def test_deal_rng(self):
+        # Dealing leaves the global generator alone, and interleaved games replay the same way
+        random.seed(7)
+        expected = random.random()
+        random.seed(7)
+        games = [Game(seed=seed, engine=engine) for seed in SEEDS for engine in ('object', 'array')]
+        assert random.random() == expected
+
+        for seed, (game, array) in zip(SEEDS, zip(games[::2], games[1::2])):
+            assert game.deck.order == Game(seed=seed).deck.order
+            assert game.state() == array.state()
+
+    def test_deals(self):
+        # Ranges of a stream are dealt independently of the deals before them
+        stream = [game.state() for index, game in deals(5, 0, 6)]
+        assert [game.state() for index, game in deals(5, 3, 6)] == stream[3:]
+        assert [Game(seed=deal_seed(5, i), engine='array').state() for i in range(6)] == stream
+        assert len({deal_seed(seed, i) for seed in range(10) for i in range(100)}) == 1000
+        assert next(deals(6))[1].state() != stream[0]
+
+    @settings(deadline=None)
+    @given(seed=st.sampled_from(SEEDS))
+    def test_find_card(self, seed):
+        game = Game(seed=seed)
+
+        def scan(rank, suit):
+            # Linear search over every pile, what `find_card` used to do
+            for pile in game.foundations + game.tableaus:
+                for c in pile.cards:
+                    if (c.rank, c.suit) == (rank, suit) and not c.hidden and (rank or suit or c is pile.target()):
+                        return c
+            for c in game.deck.cards + game.deck.waste:
+                if (c.rank, c.suit) == (rank, suit) and not c.hidden:
+                    return c
+
+        for x in range(200):
+            try:
+                chosen_move = random.choice(game.legal_moves())
+                game.move_cards(chosen_move)
+            except IndexError:
+                game.deck.draw()
+
+            for number, (rank, suit) in cards_mapping.items():
+                assert game.find_card(rank, suit) is scan(rank, suit)
+                assert game.find_number(number) is scan(rank, suit)
+                if number != 57:
+                    pile, index = game.locate(number)
+                    if pile is game.deck:
+                        assert game.numbers[number] in game.deck.cards + game.deck.waste
+                    else:
+                        assert pile.cards[index] is game.numbers[number]
+
+    @given(seed=st.sampled_from(SEEDS))
+    def test_clone(self, seed):
+        game, choices = Game(seed=seed), random.Random(seed)
+        states = [game.state()]
+        for x in range(60):
+            moves = game.legal_moves()
+            if moves:
+                game.move_cards(choices.choice(moves))
+            else:
+                game.draw()
+            states.append(game.state())
+
+        clone = game.clone()
+        assert clone.state() == game.state() and clone.hash() == game.hash()
+        assert not any(c is d for c, d in zip(clone.numbers[1:53], game.numbers[1:53]))
+        # Playing on the clone leaves the game alone, and the clone undoes the moves played before it was made
+        for x in range(60):
+            moves = clone.legal_moves()
+            if moves:
+                clone.move_cards(choices.choice(moves))
+            else:
+                clone.draw()
+        assert game.state() == states[-1]
+        while clone.undo():
+            pass
+        assert clone.state() == states[0] and clone.hash() == Game(seed=seed).hash()
+        assert game.state() == states[-1]
+
+    @pytest.mark.parametrize('engine', ['object', 'array'])
+    def test_action_mask(self, engine):
+        game, choices = Game(seed=3, engine=engine), random.Random(0)
+        for x in range(300):
+            mask = game.action_mask()
+            moves = game.legal_moves()
+            ids = [(t, s) if engine == 'array' else (t.number, s.number) for t, s in moves]
+            expected = np.zeros(NUM_ACTIONS, bool)
+            expected[[encode_action(m) for m in ids]] = True
+            expected[[encode_action('draw'), encode_action('undo'), encode_action('end')]] = game.can_draw(), bool(game.history), True
+            assert np.array_equal(mask, expected)
+
+            if choices.random() < 0.1:
+                game.undo()
+            elif moves and choices.random() < 0.8:
+                game.move_cards(choices.choice(moves))
+            else:
+                game.draw()
+
+    def test_auto_play(self):
+        game, array, choices = Game(seed=5), Game(seed=5, engine='array'), random.Random(1)
+        for x in range(300):
+            reward, moves = game.auto_play()
+            assert (reward, [(t.number, s.number) for t, s in moves]) == array.auto_play()
+            assert game.safe_move() is None and game.state() == array.state()
+
+            heights = [len(f.cards) - 1 for f in game.foundations]
+            for t, s in game.legal_moves():
+                if t.location == 'foundation':
+                    assert not is_safe(s.number, heights)
+
+            moves = game.legal_moves()
+            if moves and choices.random() < 0.8:
+                move = choices.choice(moves)
+                array.move_cards((move[0].number, move[1].number))
+                game.move_cards(move)
+            else:
+                game.draw()
+                array.draw()
+
+    def test_move_rewards(self):
+        def reference(move):
+            # `get_move_reward` as it was, from rank names and `get_parent_card`
+            target, source = move
+            reward = FOUNDATION_SCORES[source.rank] if target.location == 'foundation' else 0.0
+            if source.location == 'foundation':
+                reward -= FOUNDATION_SCORES[source.rank]
+            if source.location == 'deck':
+                reward += 20.0
+            if source.location == 'tableau' and get_parent_card(card=source).hidden:
+                reward += 20.0
+            return reward
+
+        games = [Game(seed=seed) for seed in range(6)]
+        arrays = [Game(seed=seed, engine='array') for seed in range(6)]
+        choices = random.Random(0)
+        for x in range(200):
+            batch = []
+            for game, array in zip(games, arrays):
+                moves = game.legal_moves()
+                scores = game.score_moves().tolist()
+                assert scores == [game.get_move_reward(m) for m in moves] == [reference(m) for m in moves]
+                assert array.legal_moves() == [(t.number, s.number) for t, s in moves]
+                assert array.score_moves().tolist() == scores
+                for (target, source), score in zip(moves, scores):
+                    origin = {'tableau': FROM_TABLEAU, 'foundation': FROM_FOUNDATION, 'deck': FROM_WASTE}[source.location]
+                    revealed = origin == FROM_TABLEAU and get_parent_card(source).hidden
+                    batch.append((source.number, target.location == 'foundation', origin, revealed, score))
+                expected = [b[:4] for b in batch[len(batch) - len(moves):]]
+                assert list(zip(*game.move_features())) == list(zip(*array.move_features())) == expected
+
+                if moves and choices.random() < 0.8:
+                    # `ArrayGame` resolves an empty tableau target, 57, to the first empty tableau, so the move is
+                    # played there on `Game` too to keep both in the same position
+                    target, source = choices.choice(moves)
+                    game.move_cards((game.find_card(target.rank, target.suit), source))
+                    array.move_cards((target.number, source.number))
+                else:
+                    game.draw()
+                    array.draw()
+            if batch:
+                sources, to_foundation, origins, revealed, scores = zip(*batch)
+                assert move_rewards(sources, to_foundation, origins, revealed).tolist() == list(scores)
+        assert games[0].score_moves([]).tolist() == []
@@ -1,4 +1,4 @@
-import pytest, random
+import random, os, subprocess, sys
 import hypothesis.strategies as st
 from hypothesis import given
 from solitaire import Game
@@ -20,5 +20,25 @@ class TestIntegration:
             except IndexError:
                 game.deck.draw()
 
+    def test_import(self):
+        # Headless workers only step games, rendering and observation dependencies load when first used
+        code = (
+            'import sys, solitaire; solitaire.Game(seed=1).legal_moves(); '
+            'print(*[m for m in ("numpy", "colors", "more_itertools", "pprint", "json", "gym") if m in sys.modules])'
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        run = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        assert run.stdout.split() == []
 
+    def test_env_import(self):
+        # The server, the runner and instrumentation load with their first use, not with every environment
+        modules = ('asyncio', 'gym_solitaire.envs.server', 'gym_solitaire.envs.runner', 'solitaire.trajectory',
+                   'solitaire.profiling', 'pprint')
+        code = f'import sys, gym_solitaire.envs; print(*[m for m in {modules} if m in sys.modules])'
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        run = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        assert run.stdout.split() == []
 
+        from gym_solitaire.envs import EnvServer, RolloutRunner
+        assert EnvServer.__module__ == 'gym_solitaire.envs.server'
+        assert RolloutRunner.__module__ == 'gym_solitaire.envs.runner'
@@ -0,0 +1,89 @@
+import pytest, random, time
+import numpy as np
+from solitaire import ArrayGame, Game, OBSERVATION_SHAPES, rollout
+from solitaire.mcts import MCTS, DRAW
+
+SEEDS = (1, 2)
+
+
+class TestMCTS:
+
+    @pytest.mark.parametrize('engine', ('object', 'array'))
+    def test_act(self, engine):
+        game = Game(seed=SEEDS[0], engine=engine)
+        state = game.state()
+        agent = MCTS(max_simulations=200, seed=0)
+        action = agent.act(game)
+
+        assert game.state() == state
+        assert action == DRAW or action in game.legal_moves()
+
+    def test_prune(self):
+        game = ArrayGame(seed=SEEDS[0])
+        agent = MCTS(max_simulations=200, seed=0, prune=True)
+        action = agent.act(game)
+        assert action == DRAW or action in agent.pruner.prune(game)
+
+    def test_subtree_reuse(self):
+        game = ArrayGame(seed=SEEDS[0])
+        agent = MCTS(max_simulations=300, seed=0)
+        action = agent.act(game)
+        MCTS.play(game, action)
+
+        root = agent.root
+        visits = root.visits
+        assert visits > 0
+        assert agent.search(game) is root
+        assert root.visits == visits + 300
+
+        # A different position starts a new tree
+        assert agent.search(ArrayGame(seed=SEEDS[1])) is not root
+
+    @pytest.mark.parametrize('engine', ('object', 'array'))
+    def test_reuse_on_clone(self, engine):
+        # A clone in the same position gets a new tree, `Game` actions hold the searched game's cards
+        game = Game(seed=SEEDS[0], engine=engine)
+        agent = MCTS(max_simulations=100, seed=0)
+        MCTS.play(game, agent.act(game))
+        root, state = agent.root, game.state()
+
+        clone = game.clone()
+        action = agent.act(clone)
+        assert agent.root is not root
+        assert action in clone.legal_moves() or action == 'draw'
+        assert game.state() == clone.state() == state
+
+    def test_batched_evaluator(self):
+        batches = []
+
+        def evaluator(observations):
+            assert list(observations) == list(OBSERVATION_SHAPES)
+            batches.append(len(observations['Deck']))
+            return np.zeros(len(observations['Deck']))
+
+        game = ArrayGame(seed=SEEDS[0])
+        agent = MCTS(evaluator=evaluator, batch_size=16, max_simulations=100, seed=0)
+        agent.act(game)
+        assert batches == [16] * 6 + [4]
+
+    def test_time_budget(self):
+        agent = MCTS(max_simulations=10 ** 9, max_seconds=0.1, seed=0)
+        start = time.perf_counter()
+        agent.act(ArrayGame(seed=SEEDS[0]))
+        assert time.perf_counter() - start < 1.0
+
+    @pytest.mark.parametrize('engine', ('object', 'array'))
+    def test_clone_and_rollout(self, engine):
+        game = Game(seed=SEEDS[0], engine=engine)
+        game.draw()
+        clone = game.clone()
+        assert clone.state() == game.state() and clone.hash() == game.hash()
+
+        clone.draw()
+        assert clone.state() != game.state()
+        clone.undo()
+        assert clone.state() == game.state()
+
+        state = game.state()
+        rollout(game, 50, random.Random(0))
+        assert game.state() == state
@@ -0,0 +1,65 @@
+from solitaire import Game, ArrayGame, profiling
+from solitaire.profiling import Stats, instrument, merge
+from gym_solitaire.envs.env import SolitaireEnv
+
+
+class TestProfiling:
+
+    def test_instrument(self):
+        legal_moves = Game.__dict__['legal_moves']
+        with instrument() as stats:
+            game = Game(seed=1)
+            for x in range(30):
+                moves = game.legal_moves()
+                if moves:
+                    game.move_cards(moves[0])
+                else:
+                    game.draw()
+            game.state()
+            SolitaireEnv({'seed': 1}).step(1)
+
+        assert stats.calls['Game.legal_moves'] >= 31
+        # One from the game, one for the observation `SolitaireEnv.step` returns
+        assert stats.calls['Game.state'] == 2
+        assert stats.calls['SolitaireEnv.step'] == 1
+        assert stats.calls['Deck.draw'] >= 1
+        assert stats.seconds['Game.legal_moves'] > 0
+        assert sum(stats.histograms['branching_factor'].values()) == stats.calls['Game.legal_moves']
+        assert sum(stats.histograms['pile_length'].values()) == stats.calls['Game.move_cards']
+
+        # Disabled, the classes have their own methods back
+        assert not profiling.enabled()
+        assert Game.__dict__['legal_moves'] is legal_moves
+        Game(seed=1).legal_moves()
+        assert stats.calls['Game.legal_moves'] >= 31
+
+    def test_array_game(self):
+        with instrument() as stats:
+            game = ArrayGame(seed=1)
+            for x in range(100):
+                moves = game.legal_moves()
+                if moves and x % 3:
+                    game.move_cards(moves[-1])
+                else:
+                    game.draw()
+
+        assert stats.calls['ArrayGame.legal_moves'] == 100
+        assert stats.calls['ArrayGame.draw'] + stats.calls['ArrayGame.move_cards'] == 100
+        assert max(stats.histograms['pile_length']) <= 19
+
+    def test_merge(self, tmp_path):
+        first, second = Stats(), Stats()
+        first.record('Game.state', 1.0)
+        first.observe('branching_factor', 3)
+        second.record('Game.state', 2.0)
+        second.observe('branching_factor', 3)
+        second.observe('branching_factor', 5)
+        first.dump(tmp_path / 'stats-1.json')
+        second.dump(tmp_path / 'stats-2.json')
+
+        merged = merge([str(tmp_path / 'stats-*.json')])
+        assert merged.calls['Game.state'] == 2
+        assert merged.seconds['Game.state'] == 3.0
+        assert merged.histograms['branching_factor'] == {3: 2, 5: 1}
+        assert Stats.from_dict(merged.to_dict()) == merged
+        print(); print(merged.report())
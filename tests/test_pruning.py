@@ -0,0 +1,83 @@
+import pytest, random
+from solitaire import Game, is_safe
+from solitaire.pruning import Pruner, describe, dead_end, PROGRESS
+
+SEEDS = (1, 4, 7)
+
+
+def ids(game, moves):
+    return [describe(game, m)[0] for m in moves]
+
+
+class TestPruner:
+
+    def test_rules(self):
+        with pytest.raises(ValueError):
+            Pruner(('reverse',))
+        game = Game(seed=1)
+        assert Pruner(()).moves(game) == game.legal_moves()
+
+    @pytest.mark.parametrize('seed', SEEDS)
+    def test_play(self, seed):
+        game, array = Game(seed=seed), Game(seed=seed, engine='array')
+        pruner, array_pruner = Pruner(), Pruner()
+        choices, total, kept = random.Random(seed), 0, 0
+        for x in range(300):
+            moves = pruner.moves(game)
+            assert ids(array, array_pruner.moves(array)) == ids(game, moves)
+            legal = game.legal_moves()
+            assert all(m in legal for m in moves)
+            total, kept = total + len(legal), kept + len(moves)
+
+            for move in moves:
+                (target, source), empty, to, origin, bottom = describe(game, move)
+                assert not (empty and bottom)
+                assert not (origin == 'foundation' and is_safe(source, game.heights()))
+
+                # Nothing kept goes back to a recent position
+                game.move_cards(move)
+                assert game.hash(canonical=True) not in pruner.recent
+                game.undo()
+
+            if moves and choices.random() < 0.8:
+                move = choices.choice(moves)
+                array.move_cards(describe(game, move)[0])
+                game.move_cards(move)
+            else:
+                game.draw()
+                array.draw()
+        print(); print(total, 'legal moves', kept, 'kept')
+        assert kept < total
+
+    def test_prune_is_stateless(self):
+        game, pruner = Game(seed=2), Pruner()
+        pruner.prune(game)
+        assert not pruner.recent
+        pruner.moves(game)
+        assert list(pruner.recent) == [game.hash(canonical=True)]
+
+    @pytest.mark.parametrize('engine', ['object', 'array'])
+    def test_dead_end(self, engine):
+        found = 0
+        for seed in range(20):
+            game, choices = Game(seed=seed, engine=engine), random.Random(seed)
+            for x in range(400):
+                state, key = game.state(), game.hash()
+                dead = dead_end(game)
+                assert game.state() == state and game.hash() == key
+                if dead:
+                    break
+                moves = game.legal_moves()
+                if moves and choices.random() < 0.5:
+                    game.move_cards(choices.choice(moves))
+                else:
+                    game.draw()
+            if not dead:
+                continue
+
+            # Nothing useful turns up however long the stock is drawn
+            found += 1
+            for x in range(60):
+                assert not PROGRESS.prune(game)
+                game.draw()
+        assert found
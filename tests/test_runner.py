@@ -0,0 +1,77 @@
+import random
+import numpy as np
+from gym_solitaire.envs import SolitaireEnv, RolloutRunner
+from gym_solitaire.envs.vec_env import encode_observation
+from utility import NUM_ACTIONS
+
+NUM_ENVS = 6
+
+
+class TestRolloutRunner:
+
+    def test_matches_serial_envs(self):
+        envs = [SolitaireEnv({'seed': 10 + i}) for i in range(NUM_ENVS)]
+        choices = random.Random(0)
+
+        with RolloutRunner(NUM_ENVS, num_workers=2, seed=10) as runner:
+            observations = runner.reset()
+            for i, env in enumerate(envs):
+                for key, value in encode_observation(env.reset()).items():
+                    assert np.array_equal(observations[key][i], value)
+
+            for x in range(50):
+                actions = [choices.randrange(8) for i in range(NUM_ENVS)]
+                observations, rewards, dones, infos = runner.step(actions)
+
+                for i, (env, action) in enumerate(zip(envs, actions)):
+                    observation, reward, done, info = env.step(action)
+                    if done:
+                        observation = env.reset()
+                    assert rewards[i] == reward
+                    assert dones[i] == done
+                    for key, value in encode_observation(observation).items():
+                        assert np.array_equal(observations[key][i], value)
+
+    def test_config(self):
+        # A 'seed' in the config seeds the environments like the `seed` argument
+        first = []
+        for kwargs in [{'env_config': {'seed': 3}}, {'env_config': {'seed': 3}}, {'seed': 3}]:
+            with RolloutRunner(2, num_workers=1, **kwargs) as runner:
+                first.append({k: v.copy() for k, v in runner.reset().items()})
+        for observations in first[1:]:
+            assert all(np.array_equal(first[0][k], v) for k, v in observations.items())
+
+        with RolloutRunner(2, num_workers=1, env_config={'actions': 'full'}, seed=0) as runner:
+            assert runner.single_action_space.n == NUM_ACTIONS
+
+    def test_infos(self):
+        config = {'actions': 'full', 'auto_play': True, 'dead_ends': True}
+        envs = [SolitaireEnv(dict(config, seed=10 + i)) for i in range(NUM_ENVS)]
+        choices = random.Random(0)
+
+        with RolloutRunner(NUM_ENVS, num_workers=2, env_config=config, seed=10) as runner:
+            runner.reset()
+            for env in envs:
+                env.reset()
+            for x in range(100):
+                # Mostly legal actions, so macros, repeats and dead ends come up
+                actions = [choices.choice(np.flatnonzero(env.game.action_mask())) for env in envs]
+                observations, rewards, dones, infos = runner.step(actions)
+                assert len(infos) == NUM_ENVS
+
+                for i, (env, action) in enumerate(zip(envs, actions)):
+                    observation, reward, done, info = env.step(action)
+                    if done:
+                        env.reset()
+                        info['action_mask'] = env.game.action_mask()
+                    assert np.array_equal(infos[i].pop('action_mask'), info.pop('action_mask'))
+                    assert infos[i] == info
+
+    def test_close(self):
+        runner = RolloutRunner(4, num_workers=2, seed=0)
+        runner.reset()
+        processes = list(runner.processes)
+        runner.close()
+
+        assert runner.closed
+        assert not any(p.is_alive() for p in processes)
@@ -0,0 +1,95 @@
+import pytest, asyncio, os, random, threading
+import numpy as np
+from gym_solitaire.envs import SolitaireEnv, EnvServer, RemoteSolitaireEnv
+from gym_solitaire.envs.server import Client, STEP, STEP_DTYPE
+from solitaire.trajectory import encode
+
+NUM_ENVS = 8
+
+
+@pytest.fixture(params=['tcp', 'unix'])
+def client(request, tmp_path):
+    loop = asyncio.new_event_loop()
+    server = EnvServer({'engine': 'array'})
+    path = str(tmp_path / 'server.sock') if request.param == 'unix' else None
+    address = loop.run_until_complete(server.start(path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    client = Client(path=path, address=None if path else address)
+    yield client
+    client.close()
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def assert_same(observation, expected):
+    assert list(observation) == list(expected)
+    for key, value in expected.items():
+        assert np.array_equal(observation[key], value), key
+
+
+class TestEnvServer:
+
+    def test_matches_local_envs(self, client):
+        seeds = list(range(20, 20 + NUM_ENVS))
+        ids = client.open(seeds)
+        local = [SolitaireEnv({'seed': seed, 'engine': 'array', 'observation': 'array'}) for seed in seeds]
+        for observation, env in zip(client.reset(ids), local):
+            assert_same(observation, env.reset())
+
+        choices = random.Random(0)
+        for x in range(100):
+            actions = [choices.randrange(8) for i in ids]
+            observations, rewards, dones = client.step(ids, actions)
+            for i, (env, action) in enumerate(zip(local, actions)):
+                observation, reward, done, info = env.step(action)
+                assert (rewards[i], dones[i]) == (reward, done)
+                assert_same(observations[i], observation)
+            assert client.legal_moves(ids) == [[encode(m) for m in env.game.legal_moves()] for env in local]
+
+            done = [i for i, d in zip(ids, dones) if d]
+            if done:
+                client.reset(done)
+                for i in done:
+                    local[ids.index(i)].reset()
+
+    def test_pipelining(self, client):
+        ids = client.open([1, 2])
+        client.reset(ids)
+        requests = np.zeros(2, STEP_DTYPE)
+        requests['env'], requests['action'] = ids, 1
+        for x in range(50):
+            client.submit(STEP, requests.tobytes())
+        with pytest.raises(RuntimeError):
+            client.reset(ids)
+        answers = [client.receive() for x in range(50)]
+        assert len(set(answers)) > 1 and not client.pending
+
+    def test_remote_env(self, client):
+        env, local = RemoteSolitaireEnv(client, seed=5), SolitaireEnv({'seed': 5, 'engine': 'array', 'observation': 'array'})
+        assert_same(env.reset(), local.reset())
+        for action in [1, 2, 3, 1, 4, 0]:
+            observation, reward, done, info = env.step(action)
+            expected, expected_reward, expected_done, info = local.step(action)
+            assert_same(observation, expected)
+            assert (reward, done) == (expected_reward, expected_done)
+        closed = env.id
+        env.close()
+
+        with pytest.raises(RuntimeError):
+            client.reset([closed])
+        # The connection is still usable after an error
+        assert len(client.open([None])) == 1
+
+    def test_close_unknown(self, client):
+        ids = client.open([1, 2])
+        # Nothing is closed when any id is unknown
+        with pytest.raises(RuntimeError):
+            client.close_envs([ids[0], max(ids) + 1])
+        assert len(client.reset(ids)) == 2
+        client.close_envs(ids + ids)
+        with pytest.raises(RuntimeError):
+            client.reset(ids[:1])
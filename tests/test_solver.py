@@ -0,0 +1,91 @@
+import pytest
+from solitaire import ArrayGame, Game
+from solitaire.solver import Solver, TranspositionTable, solve, DRAW, SOLVED, LIMIT
+from utility import get_card
+
+SEEDS = (0, 3, 8)
+
+
+class TestSolver:
+
+    @pytest.mark.parametrize('seed', SEEDS)
+    def test_prune(self, seed):
+        solution = solve(seed, max_nodes=20000, prune=True)
+        assert solution.status == SOLVED
+        assert solution.nodes <= solve(seed, max_nodes=20000).nodes
+
+        game = ArrayGame(seed=seed)
+        for action in solution.moves:
+            Solver.play(game, action)
+        assert bytes(game.foundations) == bytes((13, 26, 39, 52))
+
+    @pytest.mark.parametrize('seed', SEEDS)
+    def test_auto_play_keeps_solvable(self, seed):
+        game = ArrayGame(seed=seed)
+        game.draw()
+        for x in range(30):
+            game.auto_play()
+            game.draw()
+        assert solve(game, max_nodes=20000).status == SOLVED
+
+    @pytest.mark.parametrize('seed', SEEDS)
+    def test_solve(self, seed):
+        solution = solve(seed, max_nodes=20000)
+        print(); print(solution.status, len(solution.moves), solution.nodes)
+        assert solution.status == SOLVED
+
+        game = ArrayGame(seed=seed)
+        for action in solution.moves:
+            Solver.play(game, action)
+        assert bytes(game.foundations) == bytes((13, 26, 39, 52))
+
+    def test_solve_on_game_engine(self):
+        solution = solve(SEEDS[0], max_nodes=20000)
+        game = Game(seed=SEEDS[0])
+        for action in solution.moves:
+            if action == DRAW:
+                game.draw()
+            else:
+                target, source = (game.find_card(*get_card(c)) for c in action)
+                game.move_cards((target, source))
+        assert all(len(f.cards) == 14 for f in game.foundations)
+
+    def test_solve_game(self):
+        # A `Game` is solved from the position it is in, and left there
+        game = Game(seed=SEEDS[0])
+        game.draw()
+        state = game.state()
+        solution = solve(game, max_nodes=20000)
+        assert solution.status == SOLVED and game.state() == state
+
+        for action in solution.moves:
+            if action == DRAW:
+                game.draw()
+            else:
+                target, source = (game.find_card(*get_card(c)) for c in action)
+                game.move_cards((target, source))
+        assert all(len(f.cards) == 14 for f in game.foundations)
+
+        with pytest.raises(TypeError):
+            solve('0')
+
+    def test_limits(self):
+        game = ArrayGame(seed=SEEDS[0])
+        state = game.state()
+        solution = Solver(max_nodes=10).solve(game)
+
+        assert solution.status == LIMIT
+        assert solution.nodes == 10
+        assert game.state() == state
+
+    def test_transposition_table(self):
+        table = TranspositionTable(max_memory=3 * TranspositionTable.ENTRY_SIZE)
+        for key in (b'a', b'b', b'c'):
+            table.add(key)
+        assert b'a' in table
+        table.add(b'd')
+
+        assert len(table) == 3
+        assert b'b' not in table
+        assert b'a' in table
+        assert table.evictions == 1
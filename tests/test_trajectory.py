@@ -0,0 +1,70 @@
+import pytest, os, random
+from gym_solitaire.envs import SolitaireEnv
+from solitaire import Game
+from solitaire.trajectory import Recorder, read, replay, write_varint, read_varint, zigzag, unzigzag
+
+
+class TestTrajectory:
+
+    def test_varint(self):
+        out = bytearray()
+        values = [0, 1, -1, 63, -64, 64, 3249, -3249, 2 ** 40]
+        for v in values:
+            write_varint(out, zigzag(v))
+        i, decoded = 0, []
+        for v in values:
+            n, i = read_varint(out, i)
+            decoded.append(unzigzag(n))
+        assert decoded == values and i == len(out)
+
+    @pytest.mark.parametrize('engine', ['object', 'array'])
+    def test_env_replay(self, engine, tmp_path):
+        path = str(tmp_path / 'episodes.bin')
+        env = SolitaireEnv({'seed': 4, 'engine': engine, 'record': path})
+        choices = random.Random(0)
+
+        episodes = []
+        for episode in range(3):
+            observation = env.reset()
+            steps = [(0.0, observation)]
+            for x in range(150):
+                if choices.random() < 0.05:
+                    observation, reward = env.undo(), 0.0
+                else:
+                    observation, reward, done, info = env.step(choices.randrange(1, 8))
+                # Steps that changed nothing are not recorded
+                if observation != steps[-1][1]:
+                    steps.append((reward, observation))
+            episodes.append(steps)
+        env.close()
+
+        recorded = list(read(path))
+        assert len(recorded) == 3
+        for steps, episode in zip(episodes, recorded):
+            replayed = [(step.reward, step.observation) for step in replay(episode, engine=engine)]
+            assert [s for r, s in replayed] == [s for r, s in steps]
+            assert sum(r for r, s in replayed) == pytest.approx(sum(r for r, s in steps))
+        print(); print(os.path.getsize(path), 'bytes', sum(len(e.actions) for e in recorded), 'actions')
+
+    def test_chunks(self, tmp_path):
+        path = str(tmp_path / 'episodes.bin')
+        with Recorder(path, chunk_size=64) as recorder:
+            for seed in range(10):
+                game = Game(seed=seed, engine='array')
+                recorder.start(game)
+                for x in range(20):
+                    moves = game.legal_moves()
+                    action = moves[0] if moves else 'draw'
+                    if moves:
+                        game.move_cards(action)
+                    else:
+                        game.draw()
+                    recorder.record(action)
+
+        episodes = list(read(path))
+        assert len(episodes) == 10
+        for seed, episode in enumerate(episodes):
+            *steps, last = replay(episode, engine='object', observation=None)
+            assert len(steps) == 20 and last.observation is None
+            game = Game.from_deal(episode.deal)
+            assert Game(seed=seed).state() == game.state()
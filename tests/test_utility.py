@@ -0,0 +1,40 @@
+import pytest, os, subprocess, sys
+import numpy as np
+import utility
+from utility import get_actions, encode_action, decode_action, encode_actions, decode_actions, NUM_ACTIONS
+
+
+class TestActionCodec:
+
+    def test_matches_action_mapping(self):
+        mapping = get_actions()
+        assert len(mapping) == NUM_ACTIONS
+        for index, action in mapping.items():
+            assert encode_action(action) == index
+            assert decode_action(index) == action
+
+    def test_vectorized(self):
+        mapping = get_actions()
+        indices = np.arange(NUM_ACTIONS)
+        targets, sources = decode_actions(indices)
+        for i in (0, 1, 2):
+            assert targets[i] == sources[i] == 0
+
+        moves = indices[3:]
+        assert [(int(t), int(s)) for t, s in zip(targets[3:], sources[3:])] == [mapping[int(i)] for i in moves]
+        assert np.array_equal(encode_actions(targets[3:], sources[3:]), moves)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            encode_action((5, 5))
+        with pytest.raises(ValueError):
+            encode_action((0, 5))
+        with pytest.raises(ValueError):
+            decode_action(NUM_ACTIONS)
+
+    def test_lazy_action_mapping(self):
+        code = 'import utility; assert "action_mapping" not in vars(utility); from utility import action_mapping; print(len(action_mapping))'
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True).stdout
+        assert int(output) == NUM_ACTIONS
+        assert utility.action_mapping[3] == (1, 2)
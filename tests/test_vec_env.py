@@ -0,0 +1,63 @@
+import random
+import numpy as np
+from solitaire import ArrayGame, ActionMask
+from gym_solitaire.envs import VecSolitaireEnv
+from gym_solitaire.envs.vec_env import encode_observation
+
+NUM_ENVS = 16
+
+
+def assert_matches(observation, games):
+    for n, game in enumerate(games):
+        expected = encode_observation(game.state())
+        for key, value in expected.items():
+            assert np.array_equal(observation[key][n], value), (n, key)
+
+
+class TestVecSolitaireEnv:
+
+    def test_reset(self):
+        env = VecSolitaireEnv(NUM_ENVS, seed=0)
+        observation = env.reset()
+        print(); print(observation)
+
+        assert env.observation_space.contains(observation)
+        assert_matches(observation, [ArrayGame(seed=int(s)) for s in env.seeds])
+
+    def test_seed(self):
+        first, second = VecSolitaireEnv(NUM_ENVS, seed=1), VecSolitaireEnv(NUM_ENVS, seed=1)
+        first.reset(); second.reset()
+
+        assert np.array_equal(first.seeds, second.seeds)
+
+    def test_matches_array_game(self):
+        env = VecSolitaireEnv(NUM_ENVS, seed=0)
+        env.reset()
+        games = [ArrayGame(seed=int(s)) for s in env.seeds]
+        choices = random.Random(0)
+
+        for x in range(300):
+            actions = np.array([choices.choice((0,) + (1,) * 10 + (2, 3, 4, 5, 6, 7) * 8) for n in range(NUM_ENVS)])
+            observation, rewards, dones, infos = env.step(actions)
+            assert infos == [{}] * NUM_ENVS
+
+            for n, (game, action) in enumerate(zip(games, actions)):
+                reward = 0.0
+                if action == 0:
+                    games[n] = ArrayGame(seed=int(env.seeds[n]))
+                elif action == 1:
+                    reward = game.get_draw_reward()
+                    game.draw()
+                elif action - 2 < len(game.legal_moves()):
+                    move = game.legal_moves()[action - 2]
+                    reward = game.get_move_reward(move)
+                    game.move_cards(move)
+                assert rewards[n] == reward
+                assert dones[n] == (action == 0)
+
+            assert_matches(observation, games)
+            masks = env.action_masks()
+            for n, game in enumerate(games):
+                expected = game.action_mask().copy()
+                expected[ActionMask.UNDO] = False
+                assert np.array_equal(masks[n], expected), n
@@ -1,6 +1,5 @@
 from bidict import bidict
 from itertools import permutations
-from pprint import pprint
 
 cards_mapping = bidict({
         1 : ('A', 's'),
@@ -70,23 +69,100 @@ def get_number(rank='', suit=''):
 def get_card(number):
         return cards_mapping[number]
 
+# Actions are 'draw', 'undo' and 'end', then every ordered pair of different card ids in `permutations` order
+SPECIAL_ACTIONS = ('draw', 'undo', 'end')
+NUM_CARDS = len(cards_mapping)
+NUM_ACTIONS = len(SPECIAL_ACTIONS) + NUM_CARDS * (NUM_CARDS - 1)
+
 def get_actions():
     cards = cards_mapping.keys()
     card_product = permutations(cards, 2)
 
     mapping = bidict()
 
-    actions = ['draw', 'undo', 'end']
+    actions = list(SPECIAL_ACTIONS)
     actions.extend(card_product)
     for i, move in enumerate(actions):
         mapping[i] = move
     return mapping
 
-action_mapping = get_actions()
+def encode_action(action):
+    """
+    Parameters
+    ----------
+    action : str or tuple
+        'draw', 'undo', 'end' or a `(target, source)` pair of card ids
+
+    Returns
+    -------
+    int:
+        The key of `action` in `action_mapping`, computed without building it
+    """
+    if isinstance(action, str):
+        return SPECIAL_ACTIONS.index(action)
+    target, source = action
+    if not (0 < target <= NUM_CARDS and 0 < source <= NUM_CARDS) or target == source:
+        raise ValueError(f'{action} is not a pair of different card ids')
+    return len(SPECIAL_ACTIONS) + (target - 1) * (NUM_CARDS - 1) + (source - 1 if source < target else source - 2)
+
+def decode_action(index):
+    """Inverse of `encode_action`, the value of `action_mapping[index]`"""
+    if not 0 <= index < NUM_ACTIONS:
+        raise ValueError(f'{index} is not in range({NUM_ACTIONS})')
+    if index < len(SPECIAL_ACTIONS):
+        return SPECIAL_ACTIONS[index]
+    target, rest = divmod(index - len(SPECIAL_ACTIONS), NUM_CARDS - 1)
+    target += 1
+    return target, rest + 1 if rest + 1 < target else rest + 2
+
+def encode_actions(targets, sources):
+    """
+    Parameters
+    ----------
+    targets, sources : array_like
+        Card ids of a batch of moves
+
+    Returns
+    -------
+    numpy.ndarray:
+        `encode_action` of every `(target, source)` pair, as int64
+    """
+    import numpy as np
+    targets, sources = np.asarray(targets, np.int64), np.asarray(sources, np.int64)
+    return len(SPECIAL_ACTIONS) + (targets - 1) * (NUM_CARDS - 1) + sources - 1 - (sources > targets)
+
+def decode_actions(indices):
+    """
+    Parameters
+    ----------
+    indices : array_like
+        Action indices
+
+    Returns
+    -------
+    tuple:
+        Arrays of target and source card ids, 0 for 'draw', 'undo' and 'end'
+    """
+    import numpy as np
+    indices = np.asarray(indices, np.int64)
+    moves = indices >= len(SPECIAL_ACTIONS)
+    targets, rest = np.divmod(indices - len(SPECIAL_ACTIONS), NUM_CARDS - 1)
+    targets += 1
+    sources = rest + 1 + (rest + 1 >= targets)
+    return np.where(moves, targets, 0), np.where(moves, sources, 0)
+
+def __getattr__(name):
+    # `action_mapping` is built the first time it is used
+    if name == 'action_mapping':
+        global action_mapping
+        action_mapping = get_actions()
+        return action_mapping
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 
 if __name__ == '__main__':
+    from pprint import pprint
     r = get_actions()
     print(len(r))
     pprint(r)
\ No newline at end of file